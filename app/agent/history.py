@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+from app.models.notification_session import NotificationSession
+
+# Rough chars-per-token ratio for English prompt text; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+# Per-message overhead for role markers and separators in chat prompts.
+MESSAGE_OVERHEAD_TOKENS = 4
+# Longest excerpt of a single turn that is carried into the summary.
+SUMMARY_LINE_CHARS = 160
+
+
+@dataclass
+class CompactedHistory:
+    summary: Optional[str]
+    recent: List[Dict[str, Any]]
+    token_estimate: int
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_messages_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(
+        estimate_tokens(str(message.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def _summary_line(message: Dict[str, Any]) -> str:
+    content = " ".join(str(message.get("content", "")).split())
+    if len(content) > SUMMARY_LINE_CHARS:
+        content = content[:SUMMARY_LINE_CHARS - 3].rstrip() + "..."
+    return f"{message.get('role', 'user')}: {content}"
+
+
+def summarize_turns(
+    previous_summary: Optional[str],
+    turns: List[Dict[str, Any]],
+    max_tokens: int
+) -> Optional[str]:
+    """
+    Fold ``turns`` into ``previous_summary``.
+
+    The summary is one excerpt line per turn. Only the new turns are processed,
+    so the cost of each call is proportional to the turns leaving the window.
+    The first line is the session's initial instruction and is always kept;
+    when the summary exceeds ``max_tokens`` the oldest lines after it are dropped.
+    """
+    lines = previous_summary.split("\n") if previous_summary else []
+    lines.extend(_summary_line(turn) for turn in turns)
+
+    while len(lines) > 2 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(1)
+
+    return "\n".join(lines) or None
+
+
+def compact_history(
+    db_session: NotificationSession,
+    keep_turns: int,
+    token_budget: int,
+    summary_max_tokens: int
+) -> CompactedHistory:
+    """
+    Build the history the agent sees for ``db_session``.
+
+    The last ``keep_turns`` turns are kept verbatim and everything before them
+    is represented by the rolling summary cached on the session. The cache is
+    extended in place; callers are responsible for committing the session.
+    If the result is still above ``token_budget``, further turns are moved from
+    the verbatim window into the summary, always keeping the latest turn.
+    """
+    history = db_session.conversation_history or []
+    summarized_upto = db_session.history_summary_upto or 0
+    summary = db_session.history_summary
+
+    # History was rewritten (e.g. reset); rebuild the summary from scratch.
+    if summarized_upto > len(history):
+        summarized_upto = 0
+        summary = None
+
+    cutoff = max(summarized_upto, len(history) - max(keep_turns, 1))
+
+    while True:
+        if cutoff > summarized_upto:
+            summary = summarize_turns(summary, history[summarized_upto:cutoff], summary_max_tokens)
+            summarized_upto = cutoff
+
+        recent = history[cutoff:]
+        token_estimate = estimate_tokens(summary) + estimate_messages_tokens(recent)
+        if token_estimate <= token_budget or len(recent) <= 1:
+            break
+        cutoff += 1
+
+    if summarized_upto != (db_session.history_summary_upto or 0) or summary != db_session.history_summary:
+        db_session.history_summary = summary
+        db_session.history_summary_upto = summarized_upto
+
+    return CompactedHistory(summary=summary, recent=list(recent), token_estimate=token_estimate)
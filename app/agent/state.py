@@ -0,0 +1,19 @@
+from typing import List, Dict, Any, Optional, TypedDict
+
+
+class AgentState(TypedDict):
+    company_id: str
+    # Rolling summary of turns that fell out of the history window
+    history_summary: Optional[str]
+    # Only the most recent turns, kept verbatim
+    conversation_history: List[Dict[str, Any]]
+    # Precomputed company context (see AgentContextSnapshot)
+    context_version: Optional[int]
+    context_prompt: Optional[str]
+    # Data gathered by tools
+    company_profile: Optional[dict]
+    active_campaigns: Optional[List[dict]]
+    news_articles: Optional[List[dict]]
+    # Final output
+    generated_suggestions: List[str]
+    error_message: Optional[str]
@@ -1,6 +1,8 @@
 from typing import Generator
 
-from app.db.session import SessionLocal
+from fastapi import Request
+
+from app.db.session import SessionLocal, read_router
 
 
 def get_db() -> Generator:
@@ -9,3 +11,15 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request) -> Generator:
+    """
+    Session for read-only endpoints. Uses the replica when one is configured,
+    unless the requested session was written recently by this process.
+    """
+    db = read_router.session_for_read(request.path_params.get("session_id"))
+    try:
+        yield db
+    finally:
+        db.close()
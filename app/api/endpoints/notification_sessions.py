@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from app.crud import session as crud_session
 from app.schemas.session import SessionCreate, SessionResponse, Session
-from app.api.dependencies import get_db
-from app.tasks import run_agent_task
+from app.api.dependencies import get_db, get_read_db
+from app.dispatch import dispatch_agent_task
 from app.core.config import settings
+from app.db.session import read_router
+from app.models.enums import NotificationSessionStatus
+from app.core.backpressure import QueueSaturated, get_queue_monitor
+from app.core.rate_limit import AdmissionRejected, get_admission_controller
 
 router = APIRouter()
 
@@ -33,17 +37,59 @@ async def create_notification_session(
         
     Returns:
         SessionResponse with session_id and status
+
+    Raises:
+        HTTPException: 503 with Retry-After if the agent queue is saturated
+        HTTPException: 429 with Retry-After if the company or admin is over its rate
+            limit, or the company already has too many sessions processing
     """
-    db_session = crud_session.create_notification_session(db=db, session_in=session_data)
+    try:
+        queue = get_queue_monitor().check_capacity()
+    except QueueSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=e.detail,
+            headers={"Retry-After": e.retry_after_header}
+        )
+
+    # The id is chosen up front so the in-flight slot can be keyed by it
+    session_id = uuid4()
+    admission = get_admission_controller()
+    try:
+        admission.admit(session_data.company_id, session_data.admin_id, session_id)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=e.detail,
+            headers={"Retry-After": e.retry_after_header}
+        )
+
+    try:
+        db_session = crud_session.create_notification_session(
+            db=db,
+            session_in=session_data,
+            session_id=session_id
+        )
+    except Exception:
+        admission.release(session_data.company_id, session_id)
+        raise
     
-    if settings.ENABLE_ASYNC_TASKS:
-        run_agent_task.delay(str(db_session.id))
-    else:
-        run_agent_task(str(db_session.id))
+    try:
+        dispatch_agent_task(str(db_session.id))
+    except Exception as e:
+        # Leaving PROCESSING also frees the in-flight slot
+        crud_session.update_session_status(
+            db=db,
+            db_session=db_session,
+            status=NotificationSessionStatus.FAILED,
+            error_message=f"Could not dispatch agent task: {e}"
+        )
+        raise
     
     return {
         "session_id": db_session.id,
-        "status": db_session.status.value
+        "status": db_session.status.value,
+        "estimated_completion_at": queue.estimated_completion_at if queue else None
     }
 
 
@@ -59,7 +105,7 @@ async def create_notification_session(
 async def get_notification_session(
     session_id: UUID,
     company_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get the status and details of a notification session.
@@ -80,11 +126,12 @@ async def get_notification_session(
             detail="Invalid company_id format"
         )
     
-    db_session = crud_session.get_notification_session(
-        db, 
+    # A replica miss may just be lag, so read_router retries it on the primary
+    db_session = read_router.read(db, lambda session: crud_session.get_notification_session(
+        session, 
         session_id=session_id,
         company_id=company_uuid
-    )
+    ))
     
     if not db_session:
         raise HTTPException(
@@ -0,0 +1,62 @@
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core.profiling import PROFILE_ID_PATTERN, list_profiles
+
+router = APIRouter()
+
+
+def require_profiling(x_profile_token: Optional[str] = Header(None)) -> None:
+    # Without a token the routes do not exist, so profiles are never public
+    if not settings.PROFILING_ACTIVE:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if not secrets.compare_digest((x_profile_token or "").encode(), settings.PROFILING_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profiling token")
+
+
+def _profile_path(profile_id: str, extension: str) -> str:
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    path = os.path.join(settings.PROFILE_DIR, profile_id + extension)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return path
+
+
+@router.get(
+    "/profiles",
+    summary="List recent profiles",
+    dependencies=[Depends(require_profiling)]
+)
+def get_profiles(limit: int = Query(50, ge=1, le=200)):
+    """
+    List the most recent request and task profiles with their span breakdowns.
+
+    A plain ``def`` so FastAPI runs the file reads in its threadpool rather
+    than on the event loop.
+    """
+    return list_profiles(settings.PROFILE_DIR, limit=limit)
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    summary="Download a profile",
+    dependencies=[Depends(require_profiling)]
+)
+async def get_profile(profile_id: str):
+    """
+    Download the raw profile: a cProfile ``.prof`` file (open with snakeviz or
+    pstats) or a pyinstrument HTML report.
+    """
+    for extension, media_type in ((".html", "text/html"), (".prof", "application/octet-stream")):
+        try:
+            path = _profile_path(profile_id, extension)
+        except HTTPException:
+            continue
+        return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
@@ -0,0 +1,13 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app.core.profiling import span
+
+
+class ProfiledJSONResponse(JSONResponse):
+    """JSONResponse that times body encoding as the "serialization" span of the active profile."""
+
+    def render(self, content: Any) -> bytes:
+        with span("serialization"):
+            return super().render(content)
@@ -14,7 +14,13 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
-    task_track_started=True,
+    task_track_started=not settings.CELERY_SLIM_RESULTS,
+    task_ignore_result=settings.CELERY_SLIM_RESULTS,
+    task_store_errors_even_if_ignored=False,
+    result_expires=settings.CELERY_RESULT_EXPIRES,
     task_time_limit=30 * 60,
     task_soft_time_limit=25 * 60,
+    # Agent tasks are long; reserving one at a time keeps queued work visible in
+    # the broker (and to the backpressure queue depth) instead of in worker buffers
+    worker_prefetch_multiplier=1,
 )
@@ -0,0 +1,169 @@
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Default Celery queue the agent tasks are routed to
+AGENT_QUEUE = "celery"
+# Sorted set of recent agent run durations (member "<task>:<seconds>", score =
+# completion time), in the broker DB
+TASK_DURATIONS_KEY = "notification_agent:task_durations"
+# Most recent durations averaged for the estimate
+TASK_DURATION_SAMPLES = 100
+
+
+@dataclass
+class QueueSnapshot:
+    depth: int
+    task_seconds: Optional[float] = None
+
+    @property
+    def estimated_wait_seconds(self) -> float:
+        """
+        Time until a task enqueued now would finish, if every worker slot
+        drains the queue at the mean recent task duration.
+
+        This measures capacity rather than the arrival rate, so an idle queue
+        stays cheap however few sessions arrived recently.
+        """
+        task_seconds = self.task_seconds or settings.AGENT_TASK_DEFAULT_SECONDS
+        return (self.depth + 1) * task_seconds / max(1, settings.AGENT_WORKER_CONCURRENCY)
+
+    @property
+    def estimated_completion_at(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.estimated_wait_seconds)
+
+
+class QueueSaturated(Exception):
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+_broker_client_instance = None
+
+
+def _broker_client():
+    """Process-wide broker client; redis-py clients are thread-safe and pool connections."""
+    global _broker_client_instance
+    if _broker_client_instance is None:
+        import redis
+
+        _broker_client_instance = redis.Redis.from_url(
+            settings.CELERY_BROKER_URL, socket_timeout=0.25, socket_connect_timeout=0.25
+        )
+    return _broker_client_instance
+
+
+class QueueMonitor:
+    """
+    Cached view of the agent queue depth and recent agent task durations.
+
+    The broker is read at most once per QUEUE_STATS_CACHE_SECONDS with one
+    pipelined LLEN + ZREVRANGEBYSCORE, so request handlers can consult it on
+    every call. Errors keep the last known value, failing open.
+
+    Depth is a lower bound: LLEN does not see messages a worker has reserved
+    but not started (prefetch_multiplier x concurrency per worker, which
+    celery_app keeps at one per slot).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[QueueSnapshot] = None
+        self._fetched_at = 0.0
+
+    def _fetch(self) -> Tuple[int, Optional[float]]:
+        """Return the queue depth and the mean duration of recent agent runs, if any."""
+        now = time.time()
+        pipe = _broker_client().pipeline()
+        pipe.llen(AGENT_QUEUE)
+        pipe.zrevrangebyscore(
+            TASK_DURATIONS_KEY, now, now - settings.TASK_DURATION_WINDOW_SECONDS,
+            start=0, num=TASK_DURATION_SAMPLES
+        )
+        depth, members = pipe.execute()
+        durations = [float(member.rsplit(b":", 1)[1]) for member in members]
+        return depth, (sum(durations) / len(durations) if durations else None)
+
+    def snapshot(self) -> Optional[QueueSnapshot]:
+        if not settings.ENABLE_ASYNC_TASKS:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            if self._snapshot is not None and now - self._fetched_at < settings.QUEUE_STATS_CACHE_SECONDS:
+                return self._snapshot
+            try:
+                depth, task_seconds = self._fetch()
+                self._snapshot = QueueSnapshot(depth=depth, task_seconds=task_seconds)
+            except Exception as e:
+                logger.warning("Could not read queue stats from broker: %s", e)
+            self._fetched_at = now
+            return self._snapshot
+
+    def check_capacity(self) -> Optional[QueueSnapshot]:
+        """Raise QueueSaturated if new work should be shed; otherwise return the snapshot."""
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return None
+
+        wait = snapshot.estimated_wait_seconds
+        if snapshot.depth >= settings.QUEUE_DEPTH_REJECT_THRESHOLD:
+            raise QueueSaturated(
+                f"Notification agent is busy ({snapshot.depth} sessions queued); "
+                f"estimated wait {math.ceil(wait)}s",
+                wait,
+            )
+        if wait > settings.QUEUE_MAX_ESTIMATED_WAIT_SECONDS:
+            raise QueueSaturated(
+                f"Notification agent is busy; estimated wait {math.ceil(wait)}s",
+                wait - settings.QUEUE_MAX_ESTIMATED_WAIT_SECONDS,
+            )
+        return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._fetched_at = 0.0
+
+
+def record_task_completion(task_key: str, duration_seconds: float) -> None:
+    """
+    Called by the worker after each run that reached the agent, to feed the
+    task duration used by the wait estimate. Runs that ended early (missing
+    session, expired in the queue) must not be recorded: they finish in
+    milliseconds and would make the queue look faster than it is.
+    """
+    if not settings.ENABLE_ASYNC_TASKS:
+        return
+    try:
+        now = time.time()
+        pipe = _broker_client().pipeline()
+        pipe.zadd(TASK_DURATIONS_KEY, {f"{task_key}:{duration_seconds:.3f}": now})
+        pipe.zremrangebyscore(TASK_DURATIONS_KEY, 0, now - settings.TASK_DURATION_WINDOW_SECONDS)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Could not record task completion: %s", e)
+
+
+_queue_monitor: Optional[QueueMonitor] = None
+
+
+def get_queue_monitor() -> QueueMonitor:
+    global _queue_monitor
+    if _queue_monitor is None:
+        _queue_monitor = QueueMonitor()
+    return _queue_monitor
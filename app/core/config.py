@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 import os
 from dotenv import load_dotenv
@@ -19,6 +20,18 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    # Optional read replica; reads fall back to the primary when unset
+    REPLICA_POSTGRES_SERVER: str = os.getenv("REPLICA_POSTGRES_SERVER", "")
+    REPLICA_POSTGRES_PORT: str = os.getenv("REPLICA_POSTGRES_PORT", "5432")
+    # Seconds reads for a just-written session stay on the primary
+    READ_YOUR_WRITES_PIN_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_PIN_SECONDS", "5"))
+
+    @property
+    def REPLICA_DATABASE_URL(self) -> Optional[str]:
+        if not self.REPLICA_POSTGRES_SERVER:
+            return None
+        return f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.REPLICA_POSTGRES_SERVER}:{self.REPLICA_POSTGRES_PORT}/{self.POSTGRES_DB}"
+    
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
@@ -28,15 +41,78 @@ class Settings(BaseSettings):
     REDIS_PORT: str = os.getenv("REDIS_PORT", "6379")
     ENABLE_ASYNC_TASKS: bool = os.getenv("ENABLE_ASYNC_TASKS", "false").lower() == "true"
     
+    # Slim mode: the session row is the source of truth for task outcomes, so
+    # Celery stores no per-task STARTED/result payloads in Redis
+    CELERY_SLIM_RESULTS: bool = os.getenv("CELERY_SLIM_RESULTS", "true").lower() == "true"
+    CELERY_BROKER_DB: int = int(os.getenv("CELERY_BROKER_DB", "0"))
+    CELERY_RESULT_DB: int = int(os.getenv("CELERY_RESULT_DB", "2"))
+    CELERY_RESULT_EXPIRES: int = int(os.getenv("CELERY_RESULT_EXPIRES", "3600"))
+    
     @property
     def CELERY_BROKER_URL(self) -> str:
-        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/0"
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.CELERY_BROKER_DB}"
     
     @property
     def CELERY_RESULT_BACKEND(self) -> str:
-        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/0"
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.CELERY_RESULT_DB}"
+
+    @property
+    def ADMISSION_REDIS_URL(self) -> str:
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/1"
+
+    @property
+    def READ_PIN_REDIS_URL(self) -> str:
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/1"
+
+    # Admission control (per-tenant rate limits)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_COMPANY_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_COMPANY_PER_MINUTE", "60"))
+    RATE_LIMIT_COMPANY_BURST: int = int(os.getenv("RATE_LIMIT_COMPANY_BURST", "20"))
+    RATE_LIMIT_ADMIN_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_ADMIN_PER_MINUTE", "20"))
+    RATE_LIMIT_ADMIN_BURST: int = int(os.getenv("RATE_LIMIT_ADMIN_BURST", "5"))
+    MAX_INFLIGHT_SESSIONS_PER_COMPANY: int = int(os.getenv("MAX_INFLIGHT_SESSIONS_PER_COMPANY", "50"))
+    # Covers the enqueue deadline plus task_time_limit, after which a slot is surely leaked
+    INFLIGHT_SLOT_TTL_SECONDS: int = int(os.getenv("INFLIGHT_SLOT_TTL_SECONDS", str(50 * 60)))
+    INFLIGHT_RETRY_AFTER_SECONDS: int = int(os.getenv("INFLIGHT_RETRY_AFTER_SECONDS", "30"))
+    # After a Redis error admission uses the in-memory backend for this long
+    # instead of paying the connect timeout on every request
+    ADMISSION_BACKEND_RETRY_SECONDS: float = float(os.getenv("ADMISSION_BACKEND_RETRY_SECONDS", "10"))
 
     
+    # Backpressure: shed new sessions with 503 when the agent queue is saturated
+    QUEUE_DEPTH_REJECT_THRESHOLD: int = int(os.getenv("QUEUE_DEPTH_REJECT_THRESHOLD", "500"))
+    QUEUE_MAX_ESTIMATED_WAIT_SECONDS: int = int(os.getenv("QUEUE_MAX_ESTIMATED_WAIT_SECONDS", "600"))
+    QUEUE_STATS_CACHE_SECONDS: float = float(os.getenv("QUEUE_STATS_CACHE_SECONDS", "2"))
+    # The wait estimate is queue depth x mean recent task duration / worker slots
+    TASK_DURATION_WINDOW_SECONDS: int = int(os.getenv("TASK_DURATION_WINDOW_SECONDS", "300"))
+    AGENT_TASK_DEFAULT_SECONDS: int = int(os.getenv("AGENT_TASK_DEFAULT_SECONDS", "30"))
+    # Agent tasks that can run at once across all workers (the compose worker uses --pool=solo)
+    AGENT_WORKER_CONCURRENCY: int = int(os.getenv("AGENT_WORKER_CONCURRENCY", "1"))
+    # Queued tasks older than this are failed instead of run late
+    TASK_ENQUEUE_DEADLINE_SECONDS: int = int(os.getenv("TASK_ENQUEUE_DEADLINE_SECONDS", str(20 * 60)))
+
+    # Profiling (opt-in). Requests are profiled when they send X-Profile or are
+    # sampled; agent tasks are sampled. Output goes to PROFILE_DIR. Profiling
+    # stays off unless PROFILING_TOKEN is set (see PROFILING_ACTIVE).
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILER: str = os.getenv("PROFILER", "auto")  # auto, pyinstrument or cprofile
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    # Oldest profiles beyond this many are deleted whenever one is saved
+    PROFILE_MAX_COUNT: int = int(os.getenv("PROFILE_MAX_COUNT", "200"))
+    PROFILE_REQUEST_SAMPLE_RATE: float = float(os.getenv("PROFILE_REQUEST_SAMPLE_RATE", "0"))
+    PROFILE_TASK_SAMPLE_RATE: float = float(os.getenv("PROFILE_TASK_SAMPLE_RATE", "0"))
+
+    @property
+    def PROFILING_ACTIVE(self) -> bool:
+        """Profiles expose code paths and data, so they require a token."""
+        return self.PROFILING_ENABLED and bool(self.PROFILING_TOKEN)
+
+    # Agent conversation history
+    HISTORY_KEEP_TURNS: int = int(os.getenv("HISTORY_KEEP_TURNS", "6"))
+    HISTORY_TOKEN_BUDGET: int = int(os.getenv("HISTORY_TOKEN_BUDGET", "3000"))
+    HISTORY_SUMMARY_MAX_TOKENS: int = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "600"))
+
     # CORS
 
     BACKEND_CORS_ORIGINS: list[str] = ["*"]
@@ -0,0 +1,167 @@
+import base64
+import hashlib
+import re
+import struct
+from typing import Any, Dict, List, Optional
+
+# MinHash signature length, split into LSH bands of BAND_ROWS rows each.
+# 8 bands x 4 rows puts the LSH candidate threshold near 0.6 Jaccard.
+NUM_PERM = 32
+BAND_ROWS = 4
+SHINGLE_SIZE = 5
+NEAR_DUPLICATE_THRESHOLD = 0.7
+# Signature values are truncated to 32 bits for storage; an accidental match
+# between unrelated rows is then 1 in 2**32, far below the threshold's resolution.
+_SIGNATURE_MASK = 0xFFFFFFFF
+# Stored layout: one packed record per indexed suggestion (exact-match hash, then
+# the signature), base64 encoded. Band keys are recomputed when the index loads.
+INDEX_FORMAT = 2
+_ENTRY = struct.Struct(f">Q{NUM_PERM}I")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME or 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERM)
+]
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+KEPT = "kept"
+REJECTED = "rejected"
+_SOURCE_CODES = {KEPT: "k", REJECTED: "r"}
+_SOURCES_BY_CODE = {code: source for source, code in _SOURCE_CODES.items()}
+
+
+def suggestion_text(suggestion: Any) -> str:
+    if isinstance(suggestion, dict):
+        return str(suggestion.get("text") or suggestion.get("content") or "")
+    return str(suggestion)
+
+
+def normalize(text: str) -> str:
+    text = _NON_WORD.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def _exact_key(normalized: str) -> int:
+    return _hash64(normalized)
+
+
+def minhash(normalized: str) -> List[int]:
+    padded = f" {normalized} "
+    shingles = {
+        _hash64(padded[i:i + SHINGLE_SIZE])
+        for i in range(max(1, len(padded) - SHINGLE_SIZE + 1))
+    }
+    return [
+        min((a * s + b) % _MERSENNE_PRIME for s in shingles) & _SIGNATURE_MASK
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def _band_keys(signature: List[int]) -> List[str]:
+    return [
+        f"{band}:{_hash64(','.join(map(str, signature[start:start + BAND_ROWS])))}"
+        for band, start in enumerate(range(0, NUM_PERM, BAND_ROWS))
+    ]
+
+
+class SuggestionIndex:
+    """
+    Exact and near-duplicate index over a session's suggestions.
+
+    Stored as JSON on the session and extended incrementally: ``sync`` only
+    indexes suggestions added since the last call, and checking a new
+    suggestion costs one MinHash plus a lookup per LSH band, independent of
+    how many rounds the session has been through. Only the signatures are
+    stored, packed (see INDEX_FORMAT); an index in an older layout is dropped
+    and rebuilt from the suggestion lists by the next ``sync``.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        if not data or data.get("format") != INDEX_FORMAT:
+            data = {}
+        self.threshold = threshold
+        self.exact: Dict[int, str] = {}
+        self.bands: Dict[str, List[int]] = {}
+        self.signatures: List[List[int]] = []
+        self.sources: List[str] = []
+        self._exact_keys: List[int] = []
+        self.indexed: Dict[str, int] = dict(data.get("indexed", {KEPT: 0, REJECTED: 0}))
+
+        entries = _ENTRY.iter_unpack(base64.b64decode(data.get("entries", "")))
+        for (exact_key, *signature), code in zip(entries, data.get("sources", "")):
+            self._append(exact_key, signature, _SOURCES_BY_CODE[code])
+
+    def sync(self, kept: List[Any], rejected: List[Any]) -> None:
+        for source, suggestions in ((KEPT, kept), (REJECTED, rejected)):
+            start = self.indexed.get(source, 0)
+            if start > len(suggestions):
+                # The list was rewritten; entries already indexed stay, which only over-filters
+                start = len(suggestions)
+            for suggestion in suggestions[start:]:
+                self.add(suggestion_text(suggestion), source)
+            self.indexed[source] = len(suggestions)
+
+    def check(self, text: str) -> Optional[str]:
+        """Return why ``text`` should be dropped, or None if it is new."""
+        normalized = normalize(text)
+        if not normalized:
+            return "empty"
+
+        source = self.exact.get(_exact_key(normalized))
+        if source is not None:
+            return "rejected" if source == REJECTED else "duplicate"
+
+        signature = minhash(normalized)
+        candidates = {i for key in _band_keys(signature) for i in self.bands.get(key, [])}
+        for i in candidates:
+            matches = sum(1 for x, y in zip(signature, self.signatures[i]) if x == y)
+            if matches / NUM_PERM >= self.threshold:
+                return "rejected" if self.sources[i] == REJECTED else "near_duplicate"
+        return None
+
+    def add(self, text: str, source: str = KEPT) -> None:
+        normalized = normalize(text)
+        if not normalized:
+            return
+        self._append(_exact_key(normalized), minhash(normalized), source)
+
+    def _append(self, exact_key: int, signature: List[int], source: str) -> None:
+        self.exact.setdefault(exact_key, source)
+        position = len(self.signatures)
+        self._exact_keys.append(exact_key)
+        self.signatures.append(signature)
+        self.sources.append(source)
+        for key in _band_keys(signature):
+            self.bands.setdefault(key, []).append(position)
+
+    def filter_new(self, suggestions: List[Any]) -> List[Any]:
+        """Keep suggestions that are not duplicates of earlier or rejected ones, indexing them."""
+        accepted = []
+        for suggestion in suggestions:
+            text = suggestion_text(suggestion)
+            if self.check(text) is None:
+                self.add(text, KEPT)
+                accepted.append(suggestion)
+        self.indexed[KEPT] = self.indexed.get(KEPT, 0) + len(accepted)
+        return accepted
+
+    def to_dict(self) -> Dict[str, Any]:
+        entries = b"".join(
+            _ENTRY.pack(exact_key, *signature)
+            for exact_key, signature in zip(self._exact_keys, self.signatures)
+        )
+        return {
+            "format": INDEX_FORMAT,
+            "entries": base64.b64encode(entries).decode("ascii"),
+            "sources": "".join(_SOURCE_CODES[source] for source in self.sources),
+            "indexed": self.indexed,
+        }
@@ -0,0 +1,301 @@
+import cProfile
+import functools
+import json
+import os
+import random
+import re
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}T[0-9]{6}-[a-z0-9_.-]+-[0-9a-f]{8}$")
+
+_profiler_lock = threading.Lock()
+_active_profile: ContextVar[Optional["ProfileRecorder"]] = ContextVar("active_profile", default=None)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, recorder: "ProfileRecorder", name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.add_span(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def span(name: str):
+    """
+    Time a block under ``name`` (e.g. "db", "history", "serialization") in the active profile.
+
+    Outside a profiled request or task this is one ContextVar lookup.
+    """
+    recorder = _active_profile.get()
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, name)
+
+
+def _make_profiler():
+    if settings.PROFILER in ("auto", "pyinstrument"):
+        try:
+            from pyinstrument import Profiler
+
+            return Profiler(async_mode="enabled")
+        except ImportError:
+            if settings.PROFILER == "pyinstrument":
+                raise
+    return cProfile.Profile()
+
+
+class ProfileRecorder:
+    """
+    One profiled request or task: a sampling/deterministic profile plus a
+    breakdown of time spent in named spans.
+
+    cProfile only sees the thread it was started on, so sync dependencies run
+    in FastAPI's threadpool appear in the span breakdown but not in the
+    profile; install pyinstrument for full async request profiles. Work from
+    other requests interleaved on the event loop may show up in either.
+    """
+
+    def __init__(self, kind: str, label: str, metadata: Optional[Dict[str, Any]] = None):
+        self.kind = kind
+        self.label = label
+        self.metadata = metadata or {}
+        self.spans: Dict[str, Dict[str, float]] = {}
+        self.profiler = None
+        self.started_at = datetime.utcnow()
+        self.wall_seconds = 0.0
+        self._suffix = uuid.uuid4().hex[:8]
+
+    def add_span(self, name: str, seconds: float) -> None:
+        entry = self.spans.setdefault(name, {"count": 0, "total_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] += seconds * 1000
+
+    @property
+    def profile_id(self) -> str:
+        slug = re.sub(r"[^a-z0-9_.-]+", "_", self.label.lower()).strip("_")[:60] or "profile"
+        return f"{self.started_at:%Y%m%dT%H%M%S}-{slug}-{self._suffix}"
+
+    @contextmanager
+    def activate(self):
+        """Make this the active profile and profile the enclosed block."""
+        token = _active_profile.set(self)
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+            _active_profile.reset(token)
+
+    def start(self) -> None:
+        # Only one profiler can hook the interpreter at a time; overlapping
+        # profiles still get their span breakdown
+        if _profiler_lock.acquire(blocking=False):
+            self.profiler = _make_profiler()
+            if isinstance(self.profiler, cProfile.Profile):
+                self.profiler.enable()
+            else:
+                self.profiler.start()
+        self._started = time.perf_counter()
+
+    def stop(self) -> None:
+        self.wall_seconds = time.perf_counter() - self._started
+        if self.profiler is None:
+            return
+        if isinstance(self.profiler, cProfile.Profile):
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+        _profiler_lock.release()
+
+    @property
+    def _profile_file(self) -> Optional[str]:
+        if self.profiler is None:
+            return None
+        return self.profile_id + (".prof" if isinstance(self.profiler, cProfile.Profile) else ".html")
+
+    def summary(self) -> Dict[str, Any]:
+        wall_ms = self.wall_seconds * 1000
+        spans_ms = sum(entry["total_ms"] for entry in self.spans.values())
+        return {
+            "id": self.profile_id,
+            "kind": self.kind,
+            "label": self.label,
+            "metadata": self.metadata,
+            "started_at": self.started_at.isoformat(),
+            "wall_ms": round(wall_ms, 3),
+            "spans": {
+                name: {"count": entry["count"], "total_ms": round(entry["total_ms"], 3)}
+                for name, entry in sorted(self.spans.items(), key=lambda item: -item[1]["total_ms"])
+            },
+            "unaccounted_ms": round(max(0.0, wall_ms - spans_ms), 3),
+            "profile_file": self._profile_file,
+        }
+
+    def save(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        summary = self.summary()
+        if self.profiler is not None:
+            profile_path = os.path.join(directory, summary["profile_file"])
+            if isinstance(self.profiler, cProfile.Profile):
+                self.profiler.dump_stats(profile_path)
+            else:
+                with open(profile_path, "w") as f:
+                    f.write(self.profiler.output_html())
+        with open(os.path.join(directory, self.profile_id + ".json"), "w") as f:
+            json.dump(summary, f, indent=2)
+        prune_profiles(directory, settings.PROFILE_MAX_COUNT)
+        return self.profile_id
+
+
+@contextmanager
+def profile(kind: str, label: str, metadata: Optional[Dict[str, Any]] = None):
+    """Profile the enclosed block and save it to PROFILE_DIR."""
+    recorder = ProfileRecorder(kind, label, metadata)
+    try:
+        with recorder.activate():
+            yield recorder
+    finally:
+        recorder.save(settings.PROFILE_DIR)
+
+
+def sampled_task_profile(label: str):
+    """Decorator profiling a PROFILE_TASK_SAMPLE_RATE fraction of calls."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.PROFILING_ACTIVE or random.random() >= settings.PROFILE_TASK_SAMPLE_RATE:
+                return func(*args, **kwargs)
+            with profile("task", label, {"args": [str(arg) for arg in args]}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests that send ``X-Profile`` set to
+    PROFILING_TOKEN plus a PROFILE_REQUEST_SAMPLE_RATE fraction of all
+    requests. Nothing is profiled while PROFILING_ACTIVE is false. The saved
+    profile id is returned in the ``X-Profile-Id`` response header; the
+    profile is written from a worker thread so the event loop never blocks on
+    rendering or file I/O.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _requested(self, scope) -> bool:
+        if not settings.PROFILING_ACTIVE:
+            return False
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER.encode():
+                return secrets.compare_digest(value, settings.PROFILING_TOKEN.encode())
+        return random.random() < settings.PROFILE_REQUEST_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        import anyio
+
+        recorder = ProfileRecorder("request", f"{scope['method']} {scope['path']}", {"path": scope["path"]})
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-profile-id", recorder.profile_id.encode())
+                ]
+            await send(message)
+
+        try:
+            with recorder.activate():
+                await self.app(scope, receive, send_with_profile_id)
+        finally:
+            await anyio.to_thread.run_sync(recorder.save, settings.PROFILE_DIR)
+
+
+_db_spans_installed = False
+
+
+def instrument_sqlalchemy() -> None:
+    """Record every SQL statement as a "db" span while a profile is active."""
+    global _db_spans_installed
+    if _db_spans_installed:
+        return
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _active_profile.get() is not None:
+            conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        recorder = _active_profile.get()
+        starts = conn.info.get("profile_query_start")
+        if recorder is not None and starts:
+            recorder.add_span("db", time.perf_counter() - starts.pop())
+
+    _db_spans_installed = True
+
+
+def _profile_ids(directory: str) -> List[str]:
+    """Saved profile ids, newest first (ids start with their UTC start time)."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted((n[:-len(".json")] for n in os.listdir(directory) if n.endswith(".json")), reverse=True)
+
+
+def prune_profiles(directory: str, keep: int) -> None:
+    """Delete all but the newest ``keep`` profiles, so the directory stays bounded."""
+    for profile_id in _profile_ids(directory)[keep:]:
+        for extension in (".json", ".prof", ".html"):
+            try:
+                os.remove(os.path.join(directory, profile_id + extension))
+            except FileNotFoundError:
+                # Another process pruned it first, or it has no profile file
+                pass
+
+
+def list_profiles(directory: str, limit: int = 100) -> List[Dict[str, Any]]:
+    names = [profile_id + ".json" for profile_id in _profile_ids(directory)[:limit]]
+    profiles = []
+    for name in names:
+        try:
+            with open(os.path.join(directory, name)) as f:
+                profiles.append(json.load(f))
+        except FileNotFoundError:
+            # Pruned since the directory was listed
+            continue
+    return profiles
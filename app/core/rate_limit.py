@@ -0,0 +1,265 @@
+import logging
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Atomically refill and take one token. Returns the seconds to wait as a string
+# (Lua numbers are truncated to integers when returned to the client).
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+# Give back one token taken by _TOKEN_BUCKET_SCRIPT, up to ARGV[1] (the capacity)
+_REFUND_TOKEN_SCRIPT = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens then
+    redis.call('HSET', KEYS[1], 'tokens', math.min(tonumber(ARGV[1]), tokens + 1))
+end
+return 0
+"""
+
+# Trim expired slots, then take one for ARGV[3] (the session id) if under the
+# limit. Each slot carries its own deadline as its score, so slots leaked by a
+# crashed request or killed worker expire even while the tenant stays busy.
+_ACQUIRE_SLOT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[4]), ARGV[3])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return 1
+"""
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class InMemoryAdmissionBackend:
+    """
+    Per-process token buckets and in-flight slots.
+
+    Only accurate with a single API process running tasks synchronously; used
+    when Redis is not configured or unreachable.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._inflight: Dict[str, Dict[str, float]] = {}
+
+    def take_token(self, key: str, rate: float, capacity: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (float(capacity), now))
+            tokens = min(float(capacity), tokens + (now - ts) * rate)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+        return retry_after
+
+    def refund_token(self, key: str, capacity: int) -> None:
+        with self._lock:
+            if key in self._buckets:
+                tokens, ts = self._buckets[key]
+                self._buckets[key] = (min(float(capacity), tokens + 1), ts)
+
+    def acquire_slot(self, key: str, slot_id: str, limit: int, ttl: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            slots = self._inflight.setdefault(key, {})
+            for expired in [s for s, deadline in slots.items() if deadline <= now]:
+                del slots[expired]
+            if len(slots) >= limit:
+                return False
+            slots[slot_id] = now + ttl
+        return True
+
+    def release_slot(self, key: str, slot_id: str) -> None:
+        with self._lock:
+            slots = self._inflight.get(key)
+            if slots is not None:
+                slots.pop(slot_id, None)
+                if not slots:
+                    del self._inflight[key]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._inflight.clear()
+
+
+class RedisAdmissionBackend:
+    """
+    Token buckets and in-flight slot sets shared by every API and worker process.
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._take_token = self._client.register_script(_TOKEN_BUCKET_SCRIPT)
+        self._refund_token = self._client.register_script(_REFUND_TOKEN_SCRIPT)
+        self._acquire_slot = self._client.register_script(_ACQUIRE_SLOT_SCRIPT)
+
+    def take_token(self, key: str, rate: float, capacity: int) -> float:
+        return float(self._take_token(keys=[key], args=[rate, capacity, time.time()]))
+
+    def refund_token(self, key: str, capacity: int) -> None:
+        self._refund_token(keys=[key], args=[capacity])
+
+    def acquire_slot(self, key: str, slot_id: str, limit: int, ttl: int) -> bool:
+        return bool(self._acquire_slot(keys=[key], args=[time.time(), limit, slot_id, ttl]))
+
+    def release_slot(self, key: str, slot_id: str) -> None:
+        self._client.zrem(key, slot_id)
+
+    def reset(self) -> None:
+        pass
+
+
+class AdmissionController:
+    """
+    Admission control for new notification sessions.
+
+    Enforces a token bucket per company and per admin, plus a cap on sessions
+    in PROCESSING per company. The in-flight cap is a set of slots keyed by
+    session id, taken on admission and removed when the session leaves
+    PROCESSING, so no COUNT query is needed on the hot path. Every slot expires
+    after INFLIGHT_SLOT_TTL_SECONDS in case it is never released.
+
+    The admin bucket is checked before the shared company bucket, and tokens
+    are refunded when a later check rejects, so one admin retrying into a 429
+    does not drain the company's budget for its other admins.
+
+    Redis errors fall back to the in-memory backend so an outage degrades
+    limits rather than availability. After an error Redis is skipped for
+    ADMISSION_BACKEND_RETRY_SECONDS, so requests do not each wait out the
+    connect timeout on the event loop while it is down.
+    """
+
+    def __init__(self, backend, fallback: Optional[InMemoryAdmissionBackend] = None):
+        self.backend = backend
+        self.fallback = fallback or InMemoryAdmissionBackend()
+        self._backend_retry_at = 0.0
+
+    def _backend_available(self) -> bool:
+        return self.backend is not self.fallback and time.monotonic() >= self._backend_retry_at
+
+    def _backend_failed(self, e: Exception) -> None:
+        self._backend_retry_at = time.monotonic() + settings.ADMISSION_BACKEND_RETRY_SECONDS
+        logger.warning(
+            "Admission backend unavailable, using in-memory fallback for %ss: %s",
+            settings.ADMISSION_BACKEND_RETRY_SECONDS, e
+        )
+
+    def _call(self, method: str, *args):
+        if self._backend_available():
+            try:
+                return getattr(self.backend, method)(*args)
+            except Exception as e:
+                self._backend_failed(e)
+        return getattr(self.fallback, method)(*args)
+
+    def admit(self, company_id, admin_id, session_id) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        admin_key = f"admission:admin:{admin_id}"
+        company_key = f"admission:company:{company_id}"
+
+        retry_after = self._call(
+            "take_token", admin_key, settings.RATE_LIMIT_ADMIN_PER_MINUTE / 60.0, settings.RATE_LIMIT_ADMIN_BURST
+        )
+        if retry_after > 0:
+            raise AdmissionRejected("Too many sessions for this admin", retry_after)
+
+        retry_after = self._call(
+            "take_token", company_key, settings.RATE_LIMIT_COMPANY_PER_MINUTE / 60.0, settings.RATE_LIMIT_COMPANY_BURST
+        )
+        if retry_after > 0:
+            self._call("refund_token", admin_key, settings.RATE_LIMIT_ADMIN_BURST)
+            raise AdmissionRejected("Too many sessions for this company", retry_after)
+
+        if not self._call(
+            "acquire_slot",
+            f"admission:inflight:{company_id}",
+            str(session_id),
+            settings.MAX_INFLIGHT_SESSIONS_PER_COMPANY,
+            settings.INFLIGHT_SLOT_TTL_SECONDS,
+        ):
+            self._call("refund_token", admin_key, settings.RATE_LIMIT_ADMIN_BURST)
+            self._call("refund_token", company_key, settings.RATE_LIMIT_COMPANY_BURST)
+            raise AdmissionRejected(
+                "Too many sessions are already processing for this company",
+                settings.INFLIGHT_RETRY_AFTER_SECONDS,
+            )
+
+    def release(self, company_id, session_id) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        key = f"admission:inflight:{company_id}"
+        # Slots are keyed by session id, so removal is idempotent: clear it from
+        # the fallback too in case it was taken there during a Redis outage. A
+        # Redis slot that cannot be removed now expires at its deadline.
+        if self.backend is not self.fallback:
+            try:
+                self.backend.release_slot(key, str(session_id))
+            except Exception as e:
+                logger.warning("Could not release in-flight slot, it will expire: %s", e)
+        self.fallback.release_slot(key, str(session_id))
+
+    def reset(self) -> None:
+        self.backend.reset()
+        self.fallback.reset()
+        self._backend_retry_at = 0.0
+
+
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _admission_controller
+    if _admission_controller is None:
+        fallback = InMemoryAdmissionBackend()
+        backend = fallback
+        if settings.ENABLE_ASYNC_TASKS:
+            try:
+                backend = RedisAdmissionBackend(settings.ADMISSION_REDIS_URL)
+            except ImportError:
+                logger.warning("redis is not installed, using in-memory admission control")
+        _admission_controller = AdmissionController(backend, fallback)
+    return _admission_controller
@@ -0,0 +1,125 @@
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from uuid import UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.agent_context import AgentContextSnapshot
+from app.models.campaign import Campaign
+from app.models.enums import CampaignStatus
+
+
+def _render_prompt(active_campaigns: List[Dict[str, Any]], categories: List[str], themes: List[str]) -> str:
+    if not active_campaigns:
+        return "The company has no active campaigns. Write evergreen notifications that fit its brand."
+
+    lines = ["Active campaigns:"]
+    for campaign in active_campaigns:
+        line = f"- {campaign['name']} (theme: {campaign['theme']}, category: {campaign['category']}, ends {campaign['end_date'][:10]})"
+        if campaign["description"]:
+            line += f": {campaign['description']}"
+        lines.append(line)
+    lines.append(f"Categories: {', '.join(categories)}")
+    lines.append(f"Themes: {', '.join(themes)}")
+    return "\n".join(lines)
+
+
+def _build(db: Session, company_id: UUID, now: datetime) -> Dict[str, Any]:
+    campaigns = db.query(Campaign).filter(
+        Campaign.company_id == company_id,
+        Campaign.status == CampaignStatus.ACTIVE,
+        Campaign.end_date >= now
+    ).order_by(Campaign.start_date).all()
+
+    active = [c for c in campaigns if c.start_date <= now]
+    active_campaigns = [
+        {
+            "id": str(c.id),
+            "name": c.name,
+            "description": c.description,
+            "theme": c.theme,
+            "category": c.category,
+            "start_date": c.start_date.isoformat(),
+            "end_date": c.end_date.isoformat(),
+        }
+        for c in active
+    ]
+    categories = sorted({c.category for c in active})
+    themes = sorted({c.theme for c in active})
+
+    # The snapshot expires when an active campaign ends or an upcoming one starts
+    boundaries = [c.end_date for c in active] + [c.start_date for c in campaigns if c.start_date > now]
+
+    return {
+        "context": {
+            "company_profile": None,
+            "active_campaigns": active_campaigns,
+            "categories": categories,
+            "themes": themes,
+        },
+        "prompt_text": _render_prompt(active_campaigns, categories, themes),
+        "valid_until": min(boundaries) if boundaries else None,
+    }
+
+
+def _lock_snapshot(db: Session, company_id: UUID) -> Optional[AgentContextSnapshot]:
+    return db.get(AgentContextSnapshot, company_id, with_for_update=True, populate_existing=True)
+
+
+def rebuild_agent_context(
+    db: Session,
+    company_id: UUID,
+    now: Optional[datetime] = None
+) -> AgentContextSnapshot:
+    now = now or datetime.utcnow()
+
+    # Lock the snapshot row before reading campaigns: a campaign change
+    # committed meanwhile blocks on the lock in its stale-marking UPDATE and
+    # lands after this rebuild, so it is never overwritten by is_stale=False
+    snapshot = _lock_snapshot(db, company_id)
+    if snapshot is None:
+        # Create a stale placeholder first so campaign changes made while
+        # building have a row to mark
+        db.add(AgentContextSnapshot(company_id=company_id, version=0, is_stale=True, context={}, prompt_text=""))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker created it first
+            db.rollback()
+        snapshot = _lock_snapshot(db, company_id)
+
+    built = _build(db, company_id, now)
+    snapshot.version += 1
+    snapshot.context = built["context"]
+    snapshot.prompt_text = built["prompt_text"]
+    snapshot.valid_until = built["valid_until"]
+    snapshot.is_stale = False
+    snapshot.built_at = now
+
+    db.commit()
+    db.refresh(snapshot)
+    return snapshot
+
+
+def get_agent_context(
+    db: Session,
+    company_id: UUID,
+    now: Optional[datetime] = None
+) -> AgentContextSnapshot:
+    """
+    Return the company's context snapshot, rebuilding it first if it is
+    missing, stale, or past a campaign window boundary.
+    """
+    now = now or datetime.utcnow()
+    # Campaign events mark snapshots stale with a Core UPDATE, so bypass the
+    # identity map to see the current flag
+    snapshot = db.get(AgentContextSnapshot, company_id, populate_existing=True)
+
+    if (
+        snapshot is None
+        or snapshot.is_stale
+        or (snapshot.valid_until is not None and now >= snapshot.valid_until)
+    ):
+        snapshot = rebuild_agent_context(db, company_id, now)
+
+    return snapshot
@@ -2,6 +2,8 @@ from typing import Optional, Dict, Any
 from uuid import UUID
 from sqlalchemy.orm import Session
 
+from app.core.rate_limit import get_admission_controller
+from app.db.session import read_router
 from app.models.notification_session import NotificationSession
 from app.models.enums import NotificationSessionStatus
 from app.schemas.session import SessionCreate
@@ -9,7 +11,8 @@ from app.schemas.session import SessionCreate
 
 def create_notification_session(
     db: Session, 
-    session_in: SessionCreate
+    session_in: SessionCreate,
+    session_id: Optional[UUID] = None
 ) -> NotificationSession:
     initial_message = {
         "role": "user",
@@ -18,7 +21,7 @@ def create_notification_session(
     }
     
     db_session = NotificationSession(
-        id=session_in.id if hasattr(session_in, 'id') else None,
+        id=session_id,
         company_id=session_in.company_id,
         admin_id=session_in.admin_id,
         campaign_id=session_in.campaign_id,
@@ -30,6 +33,7 @@ def create_notification_session(
     db.add(db_session)
     db.commit()
     db.refresh(db_session)
+    read_router.pin(db_session.id)
     
     return db_session
 
@@ -37,22 +41,35 @@ def create_notification_session(
 def get_notification_session(
     db: Session, 
     session_id: UUID,
-    company_id: UUID
+    company_id: Optional[UUID] = None
 ) -> Optional[NotificationSession]:
-
-    return db.query(NotificationSession).filter(
-        NotificationSession.id == session_id,
-        NotificationSession.company_id == company_id
-    ).first()
+    # company_id is omitted only by the worker, which receives trusted session ids
+    query = db.query(NotificationSession).filter(NotificationSession.id == session_id)
+    if company_id is not None:
+        query = query.filter(NotificationSession.company_id == company_id)
+    return query.first()
 
 
 def update_session_status(
     db: Session, 
     db_session: NotificationSession, 
-    status: NotificationSessionStatus
+    status: NotificationSessionStatus,
+    error_message: Optional[str] = None
 ) -> NotificationSession:
 
+    previous_status = db_session.status
     db_session.status = status
+    # Task outcomes live on the session; Celery does not store results
+    db_session.error_message = error_message
     db.commit()
     db.refresh(db_session)
+    read_router.pin(db_session.id)
+
+    # Free the company's in-flight slot taken at admission
+    if (
+        previous_status == NotificationSessionStatus.PROCESSING
+        and status != NotificationSessionStatus.PROCESSING
+    ):
+        get_admission_controller().release(db_session.company_id, db_session.id)
+
     return db_session
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class InMemoryPinStore:
+    """Pins visible to this process only; used when Redis is not available."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pins: Dict[str, float] = {}
+
+    def pin(self, key: str, seconds: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._pins[key] = now + seconds
+            # Drop expired pins so the map stays proportional to recent writes
+            if len(self._pins) > 1024:
+                self._pins = {k: v for k, v in self._pins.items() if v > now}
+
+    def is_pinned(self, key: str) -> bool:
+        with self._lock:
+            expires_at = self._pins.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._pins[key]
+                return False
+        return True
+
+
+class RedisPinStore:
+    """
+    Pins shared by every API and worker process, as Redis keys with a TTL, so
+    a write made by one process (or the worker) pins reads in all of them.
+    """
+
+    KEY_PREFIX = "read_pin:"
+
+    def __init__(self, url: str):
+        self.url = url
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        return self._client
+
+    def pin(self, key: str, seconds: float) -> None:
+        try:
+            self.client.set(self.KEY_PREFIX + key, 1, px=max(1, int(seconds * 1000)))
+        except Exception as e:
+            logger.warning("Could not record read pin: %s", e)
+
+    def is_pinned(self, key: str) -> bool:
+        try:
+            return bool(self.client.exists(self.KEY_PREFIX + key))
+        except Exception as e:
+            # Without pin information the primary is the only safe choice
+            logger.warning("Could not read pin, using primary: %s", e)
+            return True
+
+
+class ReadRouter:
+    """
+    Chooses between the primary and the read replica for read-only queries.
+
+    Records written recently are pinned to the primary for ``pin_seconds`` so
+    a client polling right after a create or update reads its own write even
+    if the replica is lagging. Lookups that find nothing on the replica are
+    retried on the primary (see ``read``), which covers rows the replica has
+    not received yet whether or not a pin was recorded. Without a replica
+    factory every read goes to the primary.
+    """
+
+    def __init__(
+        self,
+        primary_factory: Callable[[], Session],
+        replica_factory: Optional[Callable[[], Session]] = None,
+        pin_seconds: float = 5.0,
+        pin_store=None
+    ):
+        self.primary_factory = primary_factory
+        self.replica_factory = replica_factory
+        self.pin_seconds = pin_seconds
+        self.pin_store = pin_store or InMemoryPinStore()
+
+    def pin(self, key) -> None:
+        if self.replica_factory is None:
+            return
+        self.pin_store.pin(str(key), self.pin_seconds)
+
+    def is_pinned(self, key) -> bool:
+        if key is None:
+            return False
+        return self.pin_store.is_pinned(str(key))
+
+    def session_for_read(self, key=None) -> Session:
+        if self.replica_factory is None or self.is_pinned(key):
+            return self.primary_factory()
+        db = self.replica_factory()
+        db.info["replica"] = True
+        return db
+
+    def read(self, db: Session, query: Callable[[Session], Optional[T]]) -> Optional[T]:
+        """
+        Run ``query`` on ``db``; if it came from the replica and found nothing,
+        run it again on the primary.
+        """
+        result = query(db)
+        if result is not None or not db.info.get("replica"):
+            return result
+
+        primary = self.primary_factory()
+        try:
+            result = query(primary)
+            if result is not None:
+                # Loaded attributes stay readable after the session closes
+                primary.expunge(result)
+            return result
+        finally:
+            primary.close()
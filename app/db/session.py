@@ -2,6 +2,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from ..core.config import settings
+from .routing import InMemoryPinStore, ReadRouter, RedisPinStore
 
 # Create database engine
 engine = create_engine(
@@ -19,6 +20,32 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Optional read replica for polling and listing queries
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.REPLICA_DATABASE_URL:
+    replica_engine = create_engine(
+        settings.REPLICA_DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=20,
+        max_overflow=10,
+        pool_recycle=3600
+    )
+    ReplicaSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=replica_engine
+    )
+
+# Pins must be visible to the worker and every API process, so they live in
+# Redis whenever it is available
+read_router = ReadRouter(
+    primary_factory=SessionLocal,
+    replica_factory=ReplicaSessionLocal,
+    pin_seconds=settings.READ_YOUR_WRITES_PIN_SECONDS,
+    pin_store=RedisPinStore(settings.READ_PIN_REDIS_URL) if settings.ENABLE_ASYNC_TASKS else InMemoryPinStore()
+)
+
 # Create a base class for declarative class definitions
 Base = declarative_base()
 
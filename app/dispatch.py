@@ -0,0 +1,20 @@
+import time
+
+from app.core.config import settings
+
+# Tasks are dispatched by name so the API never imports app.tasks (and with it
+# the agent and LLM stack) just to enqueue work.
+RUN_AGENT_TASK = "app.tasks.run_agent_task"
+
+
+def dispatch_agent_task(session_id: str) -> None:
+    if settings.ENABLE_ASYNC_TASKS:
+        from app.celery_app import celery_app
+
+        # enqueued_at lets the worker drop tasks that waited past their deadline
+        celery_app.send_task(RUN_AGENT_TASK, args=[session_id], kwargs={"enqueued_at": time.time()})
+    else:
+        # Synchronous mode runs the agent in-process; only import it on first use
+        from app.tasks import run_agent_task
+
+        run_agent_task(session_id)
@@ -1,15 +1,24 @@
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.health import router as health_router
 from app.api.endpoints.notification_sessions import router as notification_sessions_router
+from app.api.endpoints.profiles import router as profiles_router
+from app.api.responses import ProfiledJSONResponse
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware, instrument_sqlalchemy
 
 app = FastAPI(
     title="Notification Agent API",
     description="API for generating and managing notification suggestions",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ProfiledJSONResponse
 )
 
+logger = logging.getLogger(__name__)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -19,9 +28,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in profiling; not installed at all when disabled
+if settings.PROFILING_ACTIVE:
+    instrument_sqlalchemy()
+    app.add_middleware(ProfilingMiddleware)
+elif settings.PROFILING_ENABLED:
+    logger.warning("PROFILING_ENABLED is set but PROFILING_TOKEN is empty; profiling stays off")
+
 # Include API routers
 app.include_router(health_router, prefix="/health", tags=["Health"])
 app.include_router(notification_sessions_router, prefix="/api/v1", tags=["Notification Sessions"])
+app.include_router(profiles_router, prefix="/admin", tags=["Admin"])
 
 
 
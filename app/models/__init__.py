@@ -1,10 +1,12 @@
 from .notification_session import NotificationSession
 from .campaign import Campaign
+from .agent_context import AgentContextSnapshot
 from .enums import NotificationSessionStatus, CampaignStatus
 
 __all__ = [
     'NotificationSession',
     'Campaign',
+    'AgentContextSnapshot',
     'NotificationSessionStatus',
     'CampaignStatus'
 ]
@@ -0,0 +1,52 @@
+from datetime import datetime
+from sqlalchemy import Column, Text, JSON, DateTime, Integer, Boolean, Uuid, event, inspect, update
+
+from ..db.session import Base
+from .campaign import Campaign
+
+
+class AgentContextSnapshot(Base):
+    """
+    Precomputed per-company context handed to the agent.
+
+    Rebuilt lazily on read when marked stale by a Campaign change, or when the
+    next campaign date-window boundary (``valid_until``) has passed.
+    """
+    __tablename__ = "agent_context_snapshots"
+
+    company_id = Column(Uuid(as_uuid=True), primary_key=True)
+    version = Column(Integer, default=1, nullable=False)
+
+    context = Column(JSON, default=dict)  # Structured data: active campaigns, categories, themes
+    prompt_text = Column(Text, nullable=False, default="")  # Context rendered for the agent prompt
+
+    is_stale = Column(Boolean, default=False, nullable=False)
+    valid_until = Column(DateTime, nullable=True)  # Next time a campaign window opens or closes
+    built_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<AgentContextSnapshot(company_id={self.company_id}, version={self.version})>"
+
+
+def _mark_stale(connection, company_ids) -> None:
+    company_ids = {company_id for company_id in company_ids if company_id is not None}
+    if not company_ids:
+        return
+    connection.execute(
+        update(AgentContextSnapshot.__table__)
+        .where(AgentContextSnapshot.__table__.c.company_id.in_(company_ids))
+        .values(is_stale=True)
+    )
+
+
+@event.listens_for(Campaign, "after_insert")
+@event.listens_for(Campaign, "after_delete")
+def _campaign_written(mapper, connection, target) -> None:
+    _mark_stale(connection, [target.company_id])
+
+
+@event.listens_for(Campaign, "after_update")
+def _campaign_updated(mapper, connection, target) -> None:
+    # A campaign moved to another company invalidates both snapshots
+    previous = inspect(target).attrs.company_id.history.deleted or []
+    _mark_stale(connection, [target.company_id, *previous])
@@ -1,10 +1,11 @@
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from sqlalchemy import Column, String, Text, JSON, DateTime, ForeignKey, Integer, Enum, Uuid
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 import uuid
 
+from ..core.dedup import SuggestionIndex
 from ..db.session import Base
 from .enums import NotificationSessionStatus
 
@@ -27,10 +28,15 @@ class NotificationSession(Base):
     all_suggestions = Column(JSON, default=list)  # All suggestions generated so far
     selected_suggestions = Column(JSON, default=list)  # Suggestions selected by admin
     rejected_suggestions = Column(JSON, default=list)  # Suggestions explicitly rejected by admin
+    # Dedup index over all and rejected suggestions; deferred so status polls never load it
+    suggestion_index = deferred(Column(JSON, nullable=True))
     
     # Session tracking
     conversation_history = Column(JSON, default=list)  # Full conversation history
     feedback_history = Column(JSON, default=list)  # History of feedback provided by admin
+    history_summary = Column(Text, nullable=True)  # Rolling summary of turns outside the agent's window
+    history_summary_upto = Column(Integer, default=0)  # Number of leading turns folded into history_summary
+    error_message = Column(Text, nullable=True)  # Why the last agent run failed, if it did
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -54,11 +60,20 @@ class NotificationSession(Base):
         primaryjoin="NotificationSession.campaign_id == Campaign.id"
     )
     
-    def add_suggestions(self, suggestions: List[str]) -> None:
-        if not self.all_suggestions:
-            self.all_suggestions = []
-        self.all_suggestions.extend(suggestions)
+    def add_suggestions(self, suggestions: List[Any]) -> List[Any]:
+        """
+        Append ``suggestions``, skipping exact and near duplicates of earlier
+        rounds and of rejected suggestions. Returns the suggestions kept.
+        """
+        index = SuggestionIndex(self.suggestion_index)
+        index.sync(self.all_suggestions or [], self.rejected_suggestions or [])
+        accepted = index.filter_new(suggestions)
+
+        # Reassign rather than mutate so SQLAlchemy detects the JSON changes
+        self.all_suggestions = list(self.all_suggestions or []) + accepted
+        self.suggestion_index = index.to_dict()
         self.updated_at = datetime.utcnow()
+        return accepted
     
     def update_selections(self, selected_indices: List[int]) -> None:
         if not self.all_suggestions:
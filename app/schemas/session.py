@@ -57,8 +57,16 @@ class Session(SessionBase):
         default_factory=list,
         description="Full conversation history for this session"
     )
+    error_message: Optional[str] = Field(
+        None,
+        description="Reason the last agent run failed, if the session is FAILED"
+    )
 
 
 class SessionResponse(BaseModel):
     session_id: UUID = Field(..., description="ID of the created session")
     status: str = Field(..., description="Current status of the session")
+    estimated_completion_at: Optional[datetime] = Field(
+        None,
+        description="Estimated completion time based on queue depth and recent worker throughput"
+    )
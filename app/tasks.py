@@ -1,18 +1,66 @@
-from typing import Optional
+import logging
+import time
+from typing import Optional, TYPE_CHECKING
 from uuid import UUID
 from sqlalchemy.orm import Session as DBSession
 
 from app.celery_app import celery_app
+from app.core.backpressure import record_task_completion
+from app.core.config import settings
+from app.core.profiling import instrument_sqlalchemy, sampled_task_profile, span
 from app.db.session import SessionLocal
 from app.crud import session as crud_session
+from app.crud import agent_context as crud_agent_context
 from app.models.enums import NotificationSessionStatus
+from app.models.notification_session import NotificationSession
 
+logger = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    from app.agent.state import AgentState
 
-@celery_app.task(name="app.tasks.run_agent_task")
+if settings.PROFILING_ACTIVE:
+    instrument_sqlalchemy()
+
+
+def build_agent_state(db: DBSession, db_session: NotificationSession) -> "AgentState":
+    # Agent modules are imported on first use so worker startup stays light
+    from app.agent.history import compact_history
+
+    with span("history"):
+        compacted = compact_history(
+            db_session,
+            keep_turns=settings.HISTORY_KEEP_TURNS,
+            token_budget=settings.HISTORY_TOKEN_BUDGET,
+            summary_max_tokens=settings.HISTORY_SUMMARY_MAX_TOKENS,
+        )
+        # Persist the incrementally extended summary so the next round reuses it
+        db.commit()
+
+    with span("context"):
+        snapshot = crud_agent_context.get_agent_context(db, company_id=db_session.company_id)
+
+    return {
+        "company_id": str(db_session.company_id),
+        "history_summary": compacted.summary,
+        "conversation_history": compacted.recent,
+        "context_version": snapshot.version,
+        "context_prompt": snapshot.prompt_text,
+        "company_profile": snapshot.context.get("company_profile"),
+        "active_campaigns": snapshot.context.get("active_campaigns"),
+        "news_articles": None,
+        "generated_suggestions": [],
+        "error_message": None,
+    }
 
-def run_agent_task(session_id: str) -> dict:
+
+
+@celery_app.task(name="app.tasks.run_agent_task")
+@sampled_task_profile("run_agent_task")
+def run_agent_task(session_id: str, enqueued_at: Optional[float] = None) -> dict:
     db: DBSession = SessionLocal()
+    db_session = None
+    agent_started: Optional[float] = None
     
     try:
         session_uuid = UUID(session_id)
@@ -23,8 +71,40 @@ def run_agent_task(session_id: str) -> dict:
                 "status": "error",
                 "message": f"Session {session_id} not found"
             }
+
+        # A task that sat in a backlogged queue past its deadline is failed
+        # rather than run long after the admin stopped waiting
+        if enqueued_at is not None:
+            queued_for = time.time() - enqueued_at
+            if queued_for > settings.TASK_ENQUEUE_DEADLINE_SECONDS:
+                message = f"Task expired after waiting {int(queued_for)}s in the queue"
+                crud_session.update_session_status(
+                    db=db,
+                    db_session=db_session,
+                    status=NotificationSessionStatus.FAILED,
+                    error_message=message
+                )
+                return {
+                    "status": "expired",
+                    "session_id": session_id,
+                    "message": message
+                }
         
+        agent_started = time.monotonic()
+        # There is no agent to consume the state yet. It is built anyway so the
+        # history summary and the company context snapshot stay warm, and
+        # logged so its size can be watched
+        agent_state = build_agent_state(db, db_session)
+        logger.info(
+            "Built agent state for session %s: context v%s, %d recent turns, summary %s",
+            session_id,
+            agent_state["context_version"],
+            len(agent_state["conversation_history"]),
+            "present" if agent_state["history_summary"] else "absent",
+        )
+
         # TODO: Implement actual agent logic in future story
+
         # For now, just update status to AWAITING_REVIEW
         crud_session.update_session_status(
             db=db,
@@ -40,10 +120,12 @@ def run_agent_task(session_id: str) -> dict:
         
     except Exception as e:
         if db_session:
+            db.rollback()
             crud_session.update_session_status(
                 db=db,
                 db_session=db_session,
-                status=NotificationSessionStatus.FAILED
+                status=NotificationSessionStatus.FAILED,
+                error_message=str(e)
             )
         
         return {
@@ -54,3 +136,6 @@ def run_agent_task(session_id: str) -> dict:
     
     finally:
         db.close()
+        # Only runs that did agent work feed the task duration estimate
+        if agent_started is not None:
+            record_task_completion(session_id, time.monotonic() - agent_started)
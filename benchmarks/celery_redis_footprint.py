@@ -0,0 +1,95 @@
+"""
+Redis memory and command rate per 10k sessions, with and without slim results.
+
+For each mode this replays what Celery does in Redis for one run_agent_task
+per session: the broker publish, plus (outside slim mode) the STARTED state
+and the result payload written by the worker to the result backend. Redis is
+measured through INFO (used_memory, total_commands_processed) before and
+after. Needs a reachable Redis at REDIS_HOST/REDIS_PORT; the broker and
+result DBs it touches are flushed, so do not point it at production.
+
+Usage:
+    python -m benchmarks.celery_redis_footprint [--sessions 10000]
+"""
+import argparse
+import time
+import uuid
+
+import redis
+from celery import Celery, states
+
+from app.core.config import settings
+
+BENCH_QUEUE = "bench_celery_redis_footprint"
+
+
+def _make_app(slim: bool, broker_db: int, result_db: int) -> Celery:
+    base = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}"
+    app = Celery("bench", broker=f"{base}/{broker_db}", backend=f"{base}/{result_db}")
+    app.conf.update(
+        task_serializer="json",
+        result_serializer="json",
+        task_ignore_result=slim,
+        task_track_started=not slim,
+        result_expires=settings.CELERY_RESULT_EXPIRES,
+    )
+    return app
+
+
+def run(slim: bool, sessions: int) -> dict:
+    # The pre-slim layout shared DB 0 between broker and results
+    broker_db = settings.CELERY_BROKER_DB if slim else 0
+    result_db = settings.CELERY_RESULT_DB if slim else 0
+    app = _make_app(slim, broker_db, result_db)
+    client = redis.Redis(host=settings.REDIS_HOST, port=int(settings.REDIS_PORT))
+
+    for db in {broker_db, result_db}:
+        redis.Redis(host=settings.REDIS_HOST, port=int(settings.REDIS_PORT), db=db).flushdb()
+    info = client.info()
+    memory_before = info["used_memory"]
+    commands_before = info["total_commands_processed"]
+
+    started = time.perf_counter()
+    for _ in range(sessions):
+        session_id = str(uuid.uuid4())
+        result = app.send_task("app.tasks.run_agent_task", args=[session_id], queue=BENCH_QUEUE)
+        if not slim:
+            # What the worker writes when tracking start and storing results
+            app.backend.store_result(result.id, {"pid": 1, "hostname": "bench"}, states.STARTED)
+            app.backend.store_result(
+                result.id,
+                {"status": "success", "session_id": session_id, "message": "Agent task placeholder executed"},
+                states.SUCCESS,
+            )
+    elapsed = time.perf_counter() - started
+
+    # Drop the queued messages: their memory is identical in both modes
+    redis.Redis(host=settings.REDIS_HOST, port=int(settings.REDIS_PORT), db=broker_db).delete(BENCH_QUEUE)
+    info = client.info()
+    commands = info["total_commands_processed"] - commands_before
+
+    return {
+        "memory_bytes": info["used_memory"] - memory_before,
+        "commands": commands,
+        "ops_per_sec": commands / elapsed,
+        "elapsed_s": elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'result_mem_MB':>14} {'redis_cmds':>11} {'cmds/session':>13} {'ops/sec':>9}")
+    for slim in (False, True):
+        stats = run(slim, args.sessions)
+        print(
+            f"{'slim' if slim else 'before':>8} {stats['memory_bytes'] / 1e6:>14.2f} "
+            f"{stats['commands']:>11} {stats['commands'] / args.sessions:>13.2f} "
+            f"{stats['ops_per_sec']:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
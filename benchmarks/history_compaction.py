@@ -0,0 +1,59 @@
+"""
+Prompt size and compaction latency vs feedback round count.
+
+Simulates a session receiving feedback rounds and, for each round, compares the
+history the agent would receive without compaction against the compacted
+history (rolling summary + last K turns). Compaction runs incrementally on the
+same session object, exactly as run_agent_task does between rounds.
+
+Usage:
+    python -m benchmarks.history_compaction [--rounds 50] [--keep-turns 6]
+"""
+import argparse
+import time
+
+from app.agent.history import compact_history, estimate_messages_tokens
+from app.core.config import settings
+from app.models.notification_session import NotificationSession
+
+SUGGESTIONS = "\n".join(
+    f"{i}. Score big this weekend with our 50% off sports gear sale! Round-specific twist #{i}."
+    for i in range(1, 6)
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--keep-turns", type=int, default=settings.HISTORY_KEEP_TURNS)
+    parser.add_argument("--token-budget", type=int, default=settings.HISTORY_TOKEN_BUDGET)
+    parser.add_argument("--summary-max-tokens", type=int, default=settings.HISTORY_SUMMARY_MAX_TOKENS)
+    args = parser.parse_args()
+
+    history = [{"role": "user", "content": "Generate notifications about Sports"}]
+    db_session = NotificationSession(conversation_history=[])
+
+    print(f"{'round':>5} {'turns':>6} {'full_tokens':>12} {'compact_tokens':>15} {'compact_ms':>11}")
+    for round_no in range(1, args.rounds + 1):
+        history.append({"role": "assistant", "content": f"Here are 5 suggestions:\n{SUGGESTIONS}"})
+        history.append({"role": "user", "content": f"Round {round_no}: make them funnier and add emojis."})
+        db_session.conversation_history = list(history)
+
+        started = time.perf_counter()
+        compacted = compact_history(
+            db_session,
+            keep_turns=args.keep_turns,
+            token_budget=args.token_budget,
+            summary_max_tokens=args.summary_max_tokens,
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if round_no in (1, 2, 5) or round_no % 10 == 0:
+            print(
+                f"{round_no:>5} {len(history):>6} {estimate_messages_tokens(history):>12} "
+                f"{compacted.token_estimate:>15} {elapsed_ms:>11.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
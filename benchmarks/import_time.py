@@ -0,0 +1,81 @@
+"""
+Import-time budget check for the API and worker entry points.
+
+Runs each entry point under ``python -X importtime`` in a fresh interpreter,
+reports the cumulative import time of the entry module and the slowest
+packages it pulled in, and fails if a budget is exceeded or the API loads a
+module it must not (Celery, Redis, the agent or LLM clients).
+
+Usage:
+    python -m benchmarks.import_time [--api-budget-ms 1000] [--worker-budget-ms 1500]
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ENTRY_POINTS = {
+    "api": "app.main",
+    "worker": "app.tasks",
+}
+
+# Modules the API process must never import at startup
+API_FORBIDDEN_PREFIXES = (
+    "app.tasks",
+    "app.celery_app",
+    "app.agent",
+    "celery",
+    "kombu",
+    "redis",
+    "langchain",
+    "langgraph",
+    "openai",
+)
+
+
+def measure(module: str) -> Tuple[int, List[Tuple[str, int]]]:
+    """Return the cumulative import time of ``module`` and of every import, in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports[name.strip()] = int(cumulative)
+    return imports[module], sorted(imports.items(), key=lambda item: item[1], reverse=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--api-budget-ms", type=float, default=1000)
+    parser.add_argument("--worker-budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    budgets = {"api": args.api_budget_ms, "worker": args.worker_budget_ms}
+
+    failed = False
+    for name, module in ENTRY_POINTS.items():
+        total_us, imports = measure(module)
+        total_ms = total_us / 1000
+        status = "ok" if total_ms <= budgets[name] else "OVER BUDGET"
+        failed |= status != "ok"
+        print(f"{name} ({module}): {total_ms:.1f} ms / budget {budgets[name]:.0f} ms [{status}]")
+        for imported, cumulative in imports[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {imported}")
+
+        if name == "api":
+            leaked = [m for m, _ in imports if m.startswith(API_FORBIDDEN_PREFIXES)]
+            if leaked:
+                failed = True
+                print(f"    forbidden imports: {', '.join(sorted(leaked))}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -34,10 +34,14 @@ CREATE TABLE IF NOT EXISTS notification_sessions (
     all_suggestions JSONB DEFAULT '[]'::jsonb,
     selected_suggestions JSONB DEFAULT '[]'::jsonb,
     rejected_suggestions JSONB DEFAULT '[]'::jsonb,
+    suggestion_index JSONB,
     
     -- Session tracking
     conversation_history JSONB DEFAULT '[]'::jsonb,
     feedback_history JSONB DEFAULT '[]'::jsonb,
+    history_summary TEXT,
+    history_summary_upto INTEGER DEFAULT 0,
+    error_message TEXT,
     
     -- Timestamps
     created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -51,6 +55,19 @@ CREATE TABLE IF NOT EXISTS notification_sessions (
         ON DELETE CASCADE
 );
 
+-- Create agent_context_snapshots table
+-- Precomputed per-company agent context; marked stale by the application
+-- whenever a campaign of the company is inserted, updated or deleted
+CREATE TABLE IF NOT EXISTS agent_context_snapshots (
+    company_id UUID PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 1,
+    context JSONB DEFAULT '{}'::jsonb,
+    prompt_text TEXT NOT NULL DEFAULT '',
+    is_stale BOOLEAN NOT NULL DEFAULT FALSE,
+    valid_until TIMESTAMP WITH TIME ZONE,
+    built_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_campaigns_company_id ON campaigns(company_id);
 CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns(status);
@@ -63,6 +80,8 @@ CREATE INDEX IF NOT EXISTS idx_notification_sessions_status ON notification_sess
 COMMENT ON TABLE campaigns IS 'Stores marketing campaign information';
 COMMENT ON COLUMN campaigns.status IS 'Current status of the campaign: DRAFT, ACTIVE, PAUSED, COMPLETED, or CANCELLED';
 
+COMMENT ON TABLE agent_context_snapshots IS 'Precomputed per-company context handed to the notification agent';
+
 COMMENT ON TABLE notification_sessions IS 'Tracks notification generation sessions';
 COMMENT ON COLUMN notification_sessions.status IS 'Current status of the notification session: PROCESSING, AWAITING_REVIEW, COMPLETED, or FAILED';
 
@@ -6,13 +6,14 @@ from sqlalchemy.pool import StaticPool
 
 from app.db.session import Base
 from app.main import app
-from app.api.dependencies import get_db
+from app.api.dependencies import get_db, get_read_db
+from app.core.backpressure import get_queue_monitor
+from app.core.rate_limit import get_admission_controller
 from unittest.mock import Mock, patch
 
-# Mock Celery task to avoid Redis dependency
+# Mock task dispatch to avoid Redis dependency
 import app.api.endpoints.notification_sessions as notification_sessions_module
-notification_sessions_module.run_agent_task = Mock()
-notification_sessions_module.run_agent_task.delay = Mock(return_value=Mock(id="test-task-id"))
+notification_sessions_module.dispatch_agent_task = Mock()
 
 
 
@@ -40,6 +41,7 @@ def override_get_db():
 
 # Override the database dependency in the FastAPI app
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 
 @pytest.fixture(scope="module", autouse=True)
@@ -74,6 +76,14 @@ def init_db():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def reset_admission_control():
+    """Give every test fresh rate-limit buckets, in-flight counters and queue stats."""
+    get_admission_controller().reset()
+    get_queue_monitor().reset()
+    yield
+
+
 @pytest.fixture(scope="function")
 def db():
     """Create a new database session for a test."""
@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime
+from sqlalchemy.orm import Session
+
+from app.crud import agent_context as crud_agent_context
+from app.models.campaign import Campaign
+from app.models.enums import CampaignStatus
+
+MID_CAMPAIGN = datetime(2025, 6, 1)
+
+
+def _add_campaign(db: Session, company_id, name, start_date, end_date) -> Campaign:
+    campaign = Campaign(
+        company_id=company_id,
+        name=name,
+        theme=f"{name} Theme",
+        category="Apparel",
+        status=CampaignStatus.ACTIVE,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    db.add(campaign)
+    db.flush()
+    return campaign
+
+
+def test_snapshot_is_built_once_and_reused(db: Session):
+    company_id = uuid.uuid4()
+    _add_campaign(db, company_id, "Year Long", datetime(2025, 1, 1), datetime(2025, 12, 31))
+
+    snapshot = crud_agent_context.get_agent_context(db, company_id, now=MID_CAMPAIGN)
+    again = crud_agent_context.get_agent_context(db, company_id, now=MID_CAMPAIGN)
+
+    assert snapshot.version == 1
+    assert again.version == 1
+    assert [c["name"] for c in snapshot.context["active_campaigns"]] == ["Year Long"]
+    assert snapshot.context["themes"] == ["Year Long Theme"]
+    assert "Year Long" in snapshot.prompt_text
+    assert snapshot.valid_until == datetime(2025, 12, 31)
+
+
+def test_campaign_change_marks_snapshot_stale(db: Session):
+    company_id = uuid.uuid4()
+    campaign = _add_campaign(db, company_id, "Year Long", datetime(2025, 1, 1), datetime(2025, 12, 31))
+    crud_agent_context.get_agent_context(db, company_id, now=MID_CAMPAIGN)
+
+    _add_campaign(db, company_id, "Summer Sale", datetime(2025, 5, 1), datetime(2025, 8, 31))
+    snapshot = crud_agent_context.get_agent_context(db, company_id, now=MID_CAMPAIGN)
+
+    assert snapshot.version == 2
+    assert {c["name"] for c in snapshot.context["active_campaigns"]} == {"Year Long", "Summer Sale"}
+    assert snapshot.valid_until == datetime(2025, 8, 31)
+
+    campaign.description = "Now with free shipping"
+    db.flush()
+    snapshot = crud_agent_context.get_agent_context(db, company_id, now=MID_CAMPAIGN)
+
+    assert snapshot.version == 3
+    assert "free shipping" in snapshot.prompt_text
+
+
+def test_snapshot_is_rebuilt_when_campaign_window_changes(db: Session):
+    company_id = uuid.uuid4()
+    _add_campaign(db, company_id, "Autumn", datetime(2025, 9, 1), datetime(2025, 11, 30))
+
+    before = crud_agent_context.get_agent_context(db, company_id, now=MID_CAMPAIGN)
+    assert before.context["active_campaigns"] == []
+    assert before.valid_until == datetime(2025, 9, 1)
+
+    opened = crud_agent_context.get_agent_context(db, company_id, now=datetime(2025, 9, 1))
+    assert opened.version == 2
+    assert [c["name"] for c in opened.context["active_campaigns"]] == ["Autumn"]
+
+    closed = crud_agent_context.get_agent_context(db, company_id, now=datetime(2025, 12, 1))
+    assert closed.version == 3
+    assert closed.valid_until is None
+    assert "no active campaigns" in closed.prompt_text
+
+
+def test_only_active_campaigns_are_included(db: Session):
+    company_id = uuid.uuid4()
+    _add_campaign(db, company_id, "Live", datetime(2025, 1, 1), datetime(2025, 12, 31))
+    for name, campaign_status in (
+        ("Draft", CampaignStatus.DRAFT),
+        ("Paused", CampaignStatus.PAUSED),
+        ("Cancelled", CampaignStatus.CANCELLED),
+    ):
+        _add_campaign(db, company_id, name, datetime(2025, 1, 1), datetime(2025, 12, 31)).status = campaign_status
+    db.flush()
+
+    snapshot = crud_agent_context.get_agent_context(db, company_id, now=MID_CAMPAIGN)
+
+    assert [c["name"] for c in snapshot.context["active_campaigns"]] == ["Live"]
+    assert "Draft" not in snapshot.prompt_text
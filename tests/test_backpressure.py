@@ -0,0 +1,155 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy.orm import Session
+
+import app.tasks as tasks_module
+from app.core import backpressure
+from app.core.backpressure import QueueSaturated, QueueSnapshot, get_queue_monitor
+from app.core.config import settings
+from app.models.notification_session import NotificationSessionStatus
+from tests.test_tasks import _create_session, _reload
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def queue_stats(monkeypatch):
+    """Serve queue depth and mean task duration from a dict instead of the broker."""
+    stats = {"depth": 0, "task_seconds": None, "fetches": 0}
+
+    def fetch():
+        stats["fetches"] += 1
+        return stats["depth"], stats["task_seconds"]
+
+    monkeypatch.setattr(settings, "ENABLE_ASYNC_TASKS", True)
+    monkeypatch.setattr(get_queue_monitor(), "_fetch", fetch)
+    return stats
+
+
+def test_estimated_wait_uses_task_duration_and_worker_slots(monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_WORKER_CONCURRENCY", 4)
+    assert QueueSnapshot(depth=7, task_seconds=10.0).estimated_wait_seconds == 20.0
+    assert QueueSnapshot(depth=1).estimated_wait_seconds == (
+        2 * settings.AGENT_TASK_DEFAULT_SECONDS / 4
+    )
+
+
+def test_light_load_burst_is_not_rejected(queue_stats, monkeypatch):
+    # A handful of sessions after a quiet period must not read as a slow queue
+    monkeypatch.setattr(settings, "AGENT_WORKER_CONCURRENCY", 2)
+    queue_stats["depth"] = 12
+    queue_stats["task_seconds"] = 20.0
+
+    snapshot = get_queue_monitor().check_capacity()
+
+    assert snapshot.estimated_wait_seconds == 130.0
+
+
+def test_fetch_averages_recorded_task_durations(monkeypatch):
+    class FakePipeline:
+        def llen(self, key):
+            pass
+
+        def zrevrangebyscore(self, key, max, min, start, num):
+            pass
+
+        def execute(self):
+            return [4, [b"session-a:10.000", b"session-b:30.000"]]
+
+    monkeypatch.setattr(backpressure, "_broker_client_instance", type("Client", (), {"pipeline": FakePipeline}))
+
+    assert backpressure.QueueMonitor()._fetch() == (4, 20.0)
+
+
+def test_queue_stats_are_cached(queue_stats):
+    monitor = get_queue_monitor()
+
+    monitor.snapshot()
+    monitor.snapshot()
+
+    assert queue_stats["fetches"] == 1
+
+
+def test_saturated_queue_is_rejected(queue_stats, monkeypatch):
+    monkeypatch.setattr(settings, "QUEUE_DEPTH_REJECT_THRESHOLD", 10)
+    queue_stats["depth"] = 10
+    queue_stats["task_seconds"] = 1.0
+
+    with pytest.raises(QueueSaturated) as exc_info:
+        get_queue_monitor().check_capacity()
+
+    assert exc_info.value.retry_after_header == "11"
+
+
+def test_create_session_returns_503_when_queue_saturated(
+    client, queue_stats, monkeypatch, test_company_id, test_admin_id, test_campaign_id
+):
+    monkeypatch.setattr(settings, "QUEUE_DEPTH_REJECT_THRESHOLD", 5)
+    queue_stats["depth"] = 50
+
+    response = client.post("/api/v1/notification-sessions", json={
+        "campaign_id": test_campaign_id,
+        "company_id": test_company_id,
+        "admin_id": test_admin_id
+    })
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert "estimated wait" in response.json()["detail"]
+    assert int(response.headers["Retry-After"]) > 0
+
+
+def test_create_session_returns_estimated_completion(
+    client, queue_stats, test_company_id, test_admin_id, test_campaign_id
+):
+    queue_stats["depth"] = 3
+    queue_stats["task_seconds"] = 1.0
+
+    response = client.post("/api/v1/notification-sessions", json={
+        "campaign_id": test_campaign_id,
+        "company_id": test_company_id,
+        "admin_id": test_admin_id
+    })
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    estimate = datetime.fromisoformat(response.json()["estimated_completion_at"])
+    assert timedelta(seconds=2) < estimate - datetime.utcnow() <= timedelta(seconds=4)
+
+
+def test_worker_drops_tasks_past_enqueue_deadline(db: Session, monkeypatch, test_company_id, test_campaign_id):
+    monkeypatch.setattr(tasks_module, "SessionLocal", TestingSessionLocal)
+    db_session = _create_session(test_company_id, test_campaign_id)
+
+    result = tasks_module.run_agent_task(
+        str(db_session.id),
+        enqueued_at=time.time() - settings.TASK_ENQUEUE_DEADLINE_SECONDS - 1
+    )
+
+    assert result["status"] == "expired"
+    stored = _reload(db_session.id)
+    assert stored.status == NotificationSessionStatus.FAILED
+    assert "expired" in stored.error_message
+
+
+def test_only_runs_reaching_the_agent_count_toward_throughput(
+    db: Session, monkeypatch, test_company_id, test_campaign_id
+):
+    recorded = []
+    monkeypatch.setattr(tasks_module, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(
+        tasks_module, "record_task_completion", lambda task_key, seconds: recorded.append(task_key)
+    )
+
+    tasks_module.run_agent_task(str(uuid.uuid4()))
+    expired = _create_session(test_company_id, test_campaign_id)
+    tasks_module.run_agent_task(
+        str(expired.id),
+        enqueued_at=time.time() - settings.TASK_ENQUEUE_DEADLINE_SECONDS - 1
+    )
+    assert recorded == []
+
+    completed = _create_session(test_company_id, test_campaign_id)
+    tasks_module.run_agent_task(str(completed.id), enqueued_at=time.time())
+    assert recorded == [str(completed.id)]
@@ -0,0 +1,98 @@
+import json
+
+from sqlalchemy import inspect
+
+from app.core.dedup import SuggestionIndex
+from app.crud import session as crud_session
+from app.models.notification_session import NotificationSession
+from tests.test_tasks import _create_session
+
+
+def test_exact_duplicates_are_dropped_after_normalization():
+    db_session = NotificationSession(all_suggestions=[], rejected_suggestions=[])
+    db_session.add_suggestions(["Score big this weekend with 50% off sports gear!"])
+
+    accepted = db_session.add_suggestions([
+        "score big this weekend with 50% off sports gear",
+        "Don't get left on the sidelines! Major deals on all team jerseys now.",
+    ])
+
+    assert accepted == ["Don't get left on the sidelines! Major deals on all team jerseys now."]
+    assert len(db_session.all_suggestions) == 2
+
+
+def test_near_duplicates_are_dropped():
+    index = SuggestionIndex()
+    index.add("Score big this weekend with our 50% off sports gear sale!")
+
+    assert index.check("Score big this weekend with our 50% off sports gear sale today!") == "near_duplicate"
+    assert index.check("New season jerseys just landed, grab yours before they sell out.") is None
+
+
+def test_rejected_suggestions_are_filtered():
+    db_session = NotificationSession(
+        all_suggestions=[],
+        rejected_suggestions=[{"text": "Flash sale: everything must go!"}],
+    )
+
+    accepted = db_session.add_suggestions([
+        {"text": "Flash sale - everything must go"},
+        {"text": "Your team's new kit is here."},
+    ])
+
+    assert accepted == [{"text": "Your team's new kit is here."}]
+
+
+def test_index_is_persisted_and_extended_incrementally():
+    db_session = NotificationSession(all_suggestions=[], rejected_suggestions=[])
+    db_session.add_suggestions(["First suggestion about sports gear"])
+    stored = SuggestionIndex(db_session.suggestion_index)
+    assert stored.indexed == {"kept": 1, "rejected": 0}
+
+    db_session.rejected_suggestions = ["A rejected idea about cheap tickets"]
+    db_session.add_suggestions(["A rejected idea about cheap tickets!", "Second suggestion about gear"])
+
+    stored = SuggestionIndex(db_session.suggestion_index)
+    assert stored.indexed == {"kept": 2, "rejected": 1}
+    assert len(stored.signatures) == 3
+    assert db_session.all_suggestions == ["First suggestion about sports gear", "Second suggestion about gear"]
+
+
+def test_stored_index_is_compact_and_round_trips():
+    index = SuggestionIndex()
+    for i in range(12):
+        index.add(f"Suggestion {i}: grab {i * 5}% off our gear this weekend only at the store")
+
+    stored = json.loads(json.dumps(index.to_dict()))
+    reloaded = SuggestionIndex(stored)
+
+    assert set(stored) == {"format", "entries", "sources", "indexed"}
+    assert len(json.dumps(stored)) < 12 * 200
+    assert reloaded.bands == index.bands
+    assert reloaded.check("Suggestion 3: grab 15% off our gear this weekend only at the store!") == "duplicate"
+
+
+def test_index_in_an_older_layout_is_rebuilt():
+    db_session = NotificationSession(
+        all_suggestions=["First suggestion about sports gear"],
+        rejected_suggestions=[],
+        suggestion_index={"signatures": [[1] * 32], "sources": ["kept"], "indexed": {"kept": 1, "rejected": 0}},
+    )
+
+    accepted = db_session.add_suggestions(["First suggestion about sports gear!", "Second suggestion about gear"])
+
+    assert accepted == ["Second suggestion about gear"]
+    assert SuggestionIndex(db_session.suggestion_index).indexed == {"kept": 2, "rejected": 0}
+
+
+def test_status_reads_do_not_load_the_index(db, test_company_id, test_campaign_id):
+    session_id = _create_session(test_company_id, test_campaign_id).id
+    db_session = crud_session.get_notification_session(db, session_id=session_id)
+    db_session.add_suggestions(["First suggestion about sports gear"])
+    db.commit()
+    db.expunge_all()
+
+    loaded = crud_session.get_notification_session(db, session_id=session_id)
+
+    assert "suggestion_index" not in inspect(loaded).dict
+    assert SuggestionIndex(loaded.suggestion_index).indexed == {"kept": 1, "rejected": 0}
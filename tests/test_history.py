@@ -0,0 +1,72 @@
+from app.agent.history import compact_history, estimate_messages_tokens, estimate_tokens
+from app.models.notification_session import NotificationSession
+
+
+def _history(rounds: int) -> list:
+    history = [{"role": "user", "content": "Generate notifications about Sports"}]
+    for i in range(rounds):
+        history.append({"role": "assistant", "content": f"Here are 5 suggestions for round {i}. " * 5})
+        history.append({"role": "user", "content": f"Feedback {i}: make them funnier and add emojis."})
+    return history
+
+
+def test_short_history_is_kept_verbatim():
+    db_session = NotificationSession(conversation_history=_history(1))
+
+    compacted = compact_history(db_session, keep_turns=6, token_budget=3000, summary_max_tokens=600)
+
+    assert compacted.summary is None
+    assert compacted.recent == db_session.conversation_history
+    assert db_session.history_summary_upto in (None, 0)
+
+
+def test_old_turns_are_folded_into_summary():
+    db_session = NotificationSession(conversation_history=_history(5))
+
+    compacted = compact_history(db_session, keep_turns=4, token_budget=3000, summary_max_tokens=600)
+
+    assert len(compacted.recent) == 4
+    assert compacted.recent == db_session.conversation_history[-4:]
+    assert db_session.history_summary_upto == len(db_session.conversation_history) - 4
+    assert db_session.history_summary == compacted.summary
+    assert compacted.summary.startswith("user: Generate notifications about Sports")
+
+
+def test_summary_is_extended_incrementally():
+    history = _history(5)
+    db_session = NotificationSession(conversation_history=list(history))
+    compact_history(db_session, keep_turns=4, token_budget=3000, summary_max_tokens=600)
+    first_summary = db_session.history_summary
+
+    db_session.conversation_history = history + [{"role": "user", "content": "One more round"}]
+    compact_history(db_session, keep_turns=4, token_budget=3000, summary_max_tokens=600)
+
+    assert db_session.history_summary.startswith(first_summary)
+    assert db_session.history_summary.count("\n") == first_summary.count("\n") + 1
+
+
+def test_token_budget_shrinks_window():
+    db_session = NotificationSession(conversation_history=_history(10))
+
+    compacted = compact_history(db_session, keep_turns=10, token_budget=200, summary_max_tokens=100)
+
+    assert len(compacted.recent) < 10
+    assert compacted.recent[-1] == db_session.conversation_history[-1]
+    assert compacted.token_estimate == (
+        estimate_tokens(compacted.summary) + estimate_messages_tokens(compacted.recent)
+    )
+
+
+def test_initial_instruction_survives_long_sessions():
+    db_session = NotificationSession(conversation_history=[])
+
+    for rounds in range(1, 31):
+        db_session.conversation_history = _history(rounds)
+        compacted = compact_history(db_session, keep_turns=6, token_budget=3000, summary_max_tokens=600)
+
+        assert compacted.summary is None or compacted.summary.startswith(
+            "user: Generate notifications about Sports"
+        )
+
+    assert "Feedback 0:" not in compacted.summary
+    assert "Sports" not in "".join(m["content"] for m in compacted.recent)
@@ -0,0 +1,20 @@
+import subprocess
+import sys
+
+from benchmarks.import_time import API_FORBIDDEN_PREFIXES
+
+
+def test_api_does_not_import_worker_or_agent_modules():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, app.main; print('\\n'.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = result.stdout.splitlines()
+
+    assert [m for m in loaded if m.startswith(API_FORBIDDEN_PREFIXES)] == []
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+import app.tasks as tasks_module
+from app.api.health import router as health_router
+from app.api.responses import ProfiledJSONResponse
+from app.core import profiling
+from app.core.config import settings
+from tests.conftest import TestingSessionLocal
+from tests.test_tasks import _create_session
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+    monkeypatch.setattr(settings, "PROFILER", "cprofile")
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _load_summaries(directory):
+    return [json.loads(path.read_text()) for path in sorted(directory.glob("*.json"))]
+
+
+def test_span_is_a_no_op_without_active_profile():
+    assert profiling.span("db") is profiling._NULL_SPAN
+
+
+def test_profile_saves_span_breakdown_and_stats(profile_dir):
+    with profiling.profile("task", "unit") as recorder:
+        with profiling.span("llm"):
+            sum(range(1000))
+        with profiling.span("llm"):
+            pass
+
+    (summary,) = _load_summaries(profile_dir)
+    assert summary["id"] == recorder.profile_id
+    assert summary["spans"]["llm"]["count"] == 2
+    assert (profile_dir / summary["profile_file"]).is_file()
+
+
+def test_middleware_profiles_requests_with_token_header(profile_dir, monkeypatch):
+    api = FastAPI(default_response_class=ProfiledJSONResponse)
+    api.add_middleware(profiling.ProfilingMiddleware)
+    api.include_router(health_router, prefix="/health")
+    client = TestClient(api)
+
+    plain = client.get("/health/health")
+    wrong_token = client.get("/health/health", headers={"X-Profile": "guess"})
+    profiled = client.get("/health/health", headers={"X-Profile": "secret"})
+
+    assert "x-profile-id" not in plain.headers
+    assert "x-profile-id" not in wrong_token.headers
+    (summary,) = _load_summaries(profile_dir)
+    assert profiled.headers["x-profile-id"] == summary["id"]
+    assert summary["label"] == "GET /health/health"
+    assert "serialization" in summary["spans"]
+
+    # Without a token profiling cannot be forced at all
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "")
+    assert "x-profile-id" not in client.get("/health/health", headers={"X-Profile": ""}).headers
+
+
+def test_sampled_agent_task_records_db_and_agent_spans(db, profile_dir, monkeypatch, test_company_id, test_campaign_id):
+    profiling.instrument_sqlalchemy()
+    monkeypatch.setattr(settings, "PROFILE_TASK_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(tasks_module, "SessionLocal", TestingSessionLocal)
+    db_session = _create_session(test_company_id, test_campaign_id)
+
+    tasks_module.run_agent_task(str(db_session.id))
+
+    (summary,) = _load_summaries(profile_dir)
+    assert summary["kind"] == "task"
+    assert {"db", "history", "context"} <= set(summary["spans"])
+
+
+def test_admin_profiles_endpoint(client, profile_dir, monkeypatch):
+    with profiling.profile("task", "listed"):
+        pass
+
+    headers = {"X-Profile-Token": "secret"}
+    listed = client.get("/admin/profiles", headers=headers)
+    assert listed.status_code == status.HTTP_200_OK
+    (summary,) = listed.json()
+
+    download = client.get(f"/admin/profiles/{summary['id']}", headers=headers)
+    assert download.status_code == status.HTTP_200_OK
+
+    assert client.get("/admin/profiles/..%2F..%2Fetc%2Fpasswd", headers=headers).status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/admin/profiles").status_code == status.HTTP_403_FORBIDDEN
+    assert client.get("/admin/profiles", headers={"X-Profile-Token": "guess"}).status_code == status.HTTP_403_FORBIDDEN
+
+    # An empty token never opens the routes
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "")
+    assert client.get("/admin/profiles", headers={"X-Profile-Token": ""}).status_code == status.HTTP_404_NOT_FOUND
+
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+    assert client.get("/admin/profiles", headers=headers).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_only_the_newest_profiles_are_kept(profile_dir, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_MAX_COUNT", 2)
+    saved = []
+    for i in range(4):
+        with profiling.profile("task", f"run-{i}") as recorder:
+            pass
+        saved.append(recorder.profile_id)
+
+    kept = {summary["id"] for summary in _load_summaries(profile_dir)}
+    assert kept == set(sorted(saved)[-2:])
+    assert len(list(profile_dir.iterdir())) == 4
+
+
+def test_admin_profiles_limit_is_bounded(client, profile_dir):
+    headers = {"X-Profile-Token": "secret"}
+    assert client.get("/admin/profiles?limit=100000", headers=headers).status_code == (
+        status.HTTP_422_UNPROCESSABLE_ENTITY
+    )
+    assert client.get("/admin/profiles?limit=0", headers=headers).status_code == (
+        status.HTTP_422_UNPROCESSABLE_ENTITY
+    )
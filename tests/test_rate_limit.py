@@ -0,0 +1,191 @@
+import uuid
+from unittest.mock import Mock
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import AdmissionController, AdmissionRejected, InMemoryAdmissionBackend
+from app.crud import session as crud_session
+from app.models.notification_session import NotificationSession, NotificationSessionStatus
+
+
+def _request(company_id, admin_id, campaign_id):
+    return {
+        "topic": "Test Topic",
+        "campaign_id": campaign_id,
+        "company_id": company_id,
+        "admin_id": admin_id
+    }
+
+
+def test_token_bucket_allows_burst_then_rejects():
+    backend = InMemoryAdmissionBackend()
+
+    assert backend.take_token("key", rate=1.0, capacity=2) == 0
+    assert backend.take_token("key", rate=1.0, capacity=2) == 0
+    assert backend.take_token("key", rate=1.0, capacity=2) > 0
+    assert backend.take_token("other", rate=1.0, capacity=2) == 0
+
+
+def test_admin_rate_limit_returns_429(client, monkeypatch, test_company_id, test_admin_id, test_campaign_id):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ADMIN_BURST", 1)
+    request_data = _request(test_company_id, test_admin_id, test_campaign_id)
+
+    first = client.post("/api/v1/notification-sessions", json=request_data)
+    second = client.post("/api/v1/notification-sessions", json=request_data)
+
+    assert first.status_code == status.HTTP_202_ACCEPTED
+    assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(second.headers["Retry-After"]) >= 1
+
+
+def test_inflight_cap_is_released_when_session_leaves_processing(
+    client, db: Session, monkeypatch, test_company_id, test_campaign_id
+):
+    monkeypatch.setattr(settings, "MAX_INFLIGHT_SESSIONS_PER_COMPANY", 1)
+
+    first = client.post(
+        "/api/v1/notification-sessions",
+        json=_request(test_company_id, str(uuid.uuid4()), test_campaign_id)
+    )
+    rejected = client.post(
+        "/api/v1/notification-sessions",
+        json=_request(test_company_id, str(uuid.uuid4()), test_campaign_id)
+    )
+    assert first.status_code == status.HTTP_202_ACCEPTED
+    assert rejected.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert rejected.headers["Retry-After"] == str(settings.INFLIGHT_RETRY_AFTER_SECONDS)
+
+    db_session = db.query(NotificationSession).filter(
+        NotificationSession.id == uuid.UUID(first.json()["session_id"])
+    ).first()
+    crud_session.update_session_status(db, db_session, NotificationSessionStatus.AWAITING_REVIEW)
+
+    admitted = client.post(
+        "/api/v1/notification-sessions",
+        json=_request(test_company_id, str(uuid.uuid4()), test_campaign_id)
+    )
+    assert admitted.status_code == status.HTTP_202_ACCEPTED
+
+
+def test_inflight_slots_expire_individually():
+    backend = InMemoryAdmissionBackend()
+
+    assert backend.acquire_slot("key", "leaked", limit=2, ttl=0)
+    assert backend.acquire_slot("key", "a", limit=2, ttl=60)
+    # The leaked slot expired on its own although the tenant kept admitting
+    assert backend.acquire_slot("key", "b", limit=2, ttl=60)
+    assert not backend.acquire_slot("key", "c", limit=2, ttl=60)
+
+    backend.release_slot("key", "a")
+    assert backend.acquire_slot("key", "c", limit=2, ttl=60)
+
+
+def test_release_during_backend_outage_does_not_touch_other_slots(monkeypatch):
+    class FlakyBackend(InMemoryAdmissionBackend):
+        failing = False
+
+        def release_slot(self, key, slot_id):
+            if self.failing:
+                raise ConnectionError("redis down")
+            super().release_slot(key, slot_id)
+
+    monkeypatch.setattr(settings, "MAX_INFLIGHT_SESSIONS_PER_COMPANY", 1)
+    primary = FlakyBackend()
+    controller = AdmissionController(primary, InMemoryAdmissionBackend())
+    controller.admit("company", "admin", "session-1")
+
+    primary.failing = True
+    controller.release("company", "session-1")
+
+    # The primary still holds the slot until it expires; nothing else was freed
+    assert primary._inflight["admission:inflight:company"].keys() == {"session-1"}
+
+
+def test_dispatch_failure_fails_session_and_frees_slot(
+    client, db: Session, monkeypatch, test_company_id, test_campaign_id
+):
+    import app.api.endpoints.notification_sessions as notification_sessions_module
+
+    monkeypatch.setattr(settings, "MAX_INFLIGHT_SESSIONS_PER_COMPANY", 1)
+    monkeypatch.setattr(
+        notification_sessions_module,
+        "dispatch_agent_task",
+        Mock(side_effect=ConnectionError("broker down"))
+    )
+    failing_client = TestClient(client.app, raise_server_exceptions=False)
+
+    response = failing_client.post(
+        "/api/v1/notification-sessions",
+        json=_request(test_company_id, str(uuid.uuid4()), test_campaign_id)
+    )
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    failed = db.query(NotificationSession).filter(
+        NotificationSession.status == NotificationSessionStatus.FAILED
+    ).one()
+    assert "broker down" in failed.error_message
+
+    monkeypatch.setattr(notification_sessions_module, "dispatch_agent_task", Mock())
+    admitted = client.post(
+        "/api/v1/notification-sessions",
+        json=_request(test_company_id, str(uuid.uuid4()), test_campaign_id)
+    )
+    assert admitted.status_code == status.HTTP_202_ACCEPTED
+
+
+def test_backend_is_skipped_for_a_while_after_an_error(monkeypatch):
+    class DownBackend(InMemoryAdmissionBackend):
+        calls = 0
+
+        def take_token(self, key, rate, capacity):
+            self.calls += 1
+            raise ConnectionError("redis down")
+
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(settings, "ADMISSION_BACKEND_RETRY_SECONDS", 10)
+    primary = DownBackend()
+    controller = AdmissionController(primary, InMemoryAdmissionBackend())
+
+    controller.admit("company", "admin", "session-1")
+    controller.admit("company", "admin", "session-2")
+    assert primary.calls == 1
+
+    clock[0] += 10
+    controller.admit("company", "admin", "session-3")
+    assert primary.calls == 2
+
+
+def test_admin_retries_do_not_drain_the_company_bucket(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ADMIN_BURST", 1)
+    monkeypatch.setattr(settings, "RATE_LIMIT_COMPANY_BURST", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ADMIN_PER_MINUTE", 1)
+    monkeypatch.setattr(settings, "RATE_LIMIT_COMPANY_PER_MINUTE", 1)
+    controller = AdmissionController(InMemoryAdmissionBackend())
+
+    controller.admit("company", "busy-admin", "session-1")
+    for _ in range(5):
+        with pytest.raises(AdmissionRejected):
+            controller.admit("company", "busy-admin", "retry")
+
+    controller.admit("company", "other-admin", "session-2")
+
+
+def test_inflight_rejection_refunds_rate_limit_tokens(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_INFLIGHT_SESSIONS_PER_COMPANY", 1)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ADMIN_BURST", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ADMIN_PER_MINUTE", 1)
+    controller = AdmissionController(InMemoryAdmissionBackend())
+
+    controller.admit("company", "admin", "session-1")
+    for _ in range(3):
+        with pytest.raises(AdmissionRejected, match="already processing"):
+            controller.admit("company", "admin", "session-2")
+
+    controller.release("company", "session-1")
+    controller.admit("company", "admin", "session-2")
@@ -0,0 +1,153 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.api.endpoints.notification_sessions as notification_sessions_module
+from app.api import dependencies
+from app.crud import session as crud_session
+from app.db.routing import InMemoryPinStore, ReadRouter
+from app.db.session import Base
+from app.schemas.session import SessionCreate
+
+
+@pytest.fixture
+def router(tmp_path):
+    """A router over two SQLite files standing in for primary and replica."""
+    engines = []
+    factories = []
+    for name in ("primary", "replica"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+        Base.metadata.create_all(bind=engine)
+        engines.append(engine)
+        factories.append(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+    yield ReadRouter(primary_factory=factories[0], replica_factory=factories[1], pin_seconds=60)
+
+    for engine in engines:
+        engine.dispose()
+
+
+def _create_on_primary(router, company_id, campaign_id):
+    db = router.primary_factory()
+    try:
+        db_session = crud_session.create_notification_session(
+            db=db,
+            session_in=SessionCreate(
+                topic="Test Topic",
+                company_id=uuid.UUID(company_id),
+                admin_id=uuid.uuid4(),
+                campaign_id=uuid.UUID(campaign_id)
+            )
+        )
+        return db_session.id
+    finally:
+        db.close()
+
+
+def test_unpinned_reads_go_to_replica(router, test_company_id, test_campaign_id):
+    session_id = _create_on_primary(router, test_company_id, test_campaign_id)
+
+    # The row exists only on the primary; an unrelated read hits the lagging replica
+    db = router.session_for_read(uuid.uuid4())
+    try:
+        assert crud_session.get_notification_session(db, session_id=session_id) is None
+    finally:
+        db.close()
+
+
+def test_recent_write_is_read_from_primary(router, monkeypatch, test_company_id, test_campaign_id):
+    monkeypatch.setattr(crud_session, "read_router", router)
+    session_id = _create_on_primary(router, test_company_id, test_campaign_id)
+
+    assert router.is_pinned(session_id)
+    db = router.session_for_read(str(session_id))
+    try:
+        assert crud_session.get_notification_session(db, session_id=session_id) is not None
+    finally:
+        db.close()
+
+
+def test_pin_expires(router, monkeypatch, test_company_id, test_campaign_id):
+    router.pin_seconds = 0
+    monkeypatch.setattr(crud_session, "read_router", router)
+    session_id = _create_on_primary(router, test_company_id, test_campaign_id)
+
+    assert not router.is_pinned(session_id)
+
+
+def test_get_read_db_routes_by_path_session_id(router, monkeypatch):
+    monkeypatch.setattr(dependencies, "read_router", router)
+    session_id = uuid.uuid4()
+    router.pin(session_id)
+
+    for path_session_id, expected in ((session_id, "primary.db"), (uuid.uuid4(), "replica.db")):
+        request = SimpleNamespace(path_params={"session_id": str(path_session_id)})
+        db_gen = dependencies.get_read_db(request)
+        db = next(db_gen)
+        assert db.get_bind().url.database.endswith(expected)
+        db_gen.close()
+
+
+def test_router_without_replica_uses_primary(router):
+    primary_only = ReadRouter(primary_factory=router.primary_factory)
+    primary_only.pin(uuid.uuid4())
+
+    db = primary_only.session_for_read(uuid.uuid4())
+    assert db.get_bind().url.database.endswith("primary.db")
+    db.close()
+
+
+def test_replica_miss_without_pin_falls_back_to_primary(router, test_company_id, test_campaign_id):
+    # Written by another process: nothing pinned here, row only on the primary
+    session_id = _create_on_primary(router, test_company_id, test_campaign_id)
+    router.pin_store = InMemoryPinStore()
+
+    db = router.session_for_read(session_id)
+    try:
+        assert db.info.get("replica")
+        found = router.read(db, lambda s: crud_session.get_notification_session(s, session_id=session_id))
+    finally:
+        db.close()
+
+    assert found is not None
+    assert found.id == session_id
+    assert found.topic == "Test Topic"
+
+
+def test_get_endpoint_returns_session_missing_from_replica(
+    client, router, monkeypatch, test_company_id, test_campaign_id
+):
+    session_id = _create_on_primary(router, test_company_id, test_campaign_id)
+    router.pin_store = InMemoryPinStore()
+    monkeypatch.setattr(notification_sessions_module, "read_router", router)
+    monkeypatch.setitem(
+        client.app.dependency_overrides,
+        dependencies.get_read_db,
+        lambda: router.session_for_read(session_id)
+    )
+
+    response = client.get(
+        f"/api/v1/notification-sessions/{session_id}",
+        params={"company_id": test_company_id}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["id"] == str(session_id)
+
+
+def test_pins_are_shared_between_processes(router):
+    # Two routers over one store stand in for two processes sharing Redis
+    other_process = ReadRouter(
+        primary_factory=router.primary_factory,
+        replica_factory=router.replica_factory,
+        pin_store=router.pin_store
+    )
+    session_id = uuid.uuid4()
+
+    other_process.pin(session_id)
+
+    assert router.is_pinned(session_id)
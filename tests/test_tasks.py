@@ -0,0 +1,71 @@
+import uuid
+from sqlalchemy.orm import Session
+
+import app.tasks as tasks_module
+from app.celery_app import celery_app
+from app.crud import session as crud_session
+from app.models.notification_session import NotificationSession, NotificationSessionStatus
+from app.schemas.session import SessionCreate
+from tests.conftest import TestingSessionLocal
+
+
+def _create_session(test_company_id, test_campaign_id) -> NotificationSession:
+    # Committed through its own session: the task rolls back on failure, which
+    # would otherwise discard the row along with the db fixture's transaction
+    db = TestingSessionLocal()
+    try:
+        return crud_session.create_notification_session(
+            db=db,
+            session_in=SessionCreate(
+                topic="Test Topic",
+                company_id=uuid.UUID(test_company_id),
+                admin_id=uuid.uuid4(),
+                campaign_id=uuid.UUID(test_campaign_id)
+            )
+        )
+    finally:
+        db.close()
+
+
+def _reload(session_id) -> NotificationSession:
+    db = TestingSessionLocal()
+    try:
+        return db.query(NotificationSession).filter(NotificationSession.id == session_id).first()
+    finally:
+        db.close()
+
+
+def test_slim_results_mode_stores_no_task_results():
+    assert celery_app.conf.task_ignore_result is True
+    assert celery_app.conf.task_track_started is False
+
+
+def test_run_agent_task_records_success_on_session(
+    db: Session, monkeypatch, test_company_id, test_campaign_id
+):
+    monkeypatch.setattr(tasks_module, "SessionLocal", TestingSessionLocal)
+    db_session = _create_session(test_company_id, test_campaign_id)
+
+    result = tasks_module.run_agent_task(str(db_session.id))
+
+    assert result["status"] == "success"
+    stored = _reload(db_session.id)
+    assert stored.status == NotificationSessionStatus.AWAITING_REVIEW
+    assert stored.error_message is None
+
+
+def test_run_agent_task_records_error_on_session(
+    db: Session, monkeypatch, test_company_id, test_campaign_id
+):
+    def fail(db, db_session):
+        raise RuntimeError("LLM unavailable")
+
+    monkeypatch.setattr(tasks_module, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(tasks_module, "build_agent_state", fail)
+    db_session = _create_session(test_company_id, test_campaign_id)
+
+    tasks_module.run_agent_task(str(db_session.id))
+
+    stored = _reload(db_session.id)
+    assert stored.status == NotificationSessionStatus.FAILED
+    assert stored.error_message == "LLM unavailable"